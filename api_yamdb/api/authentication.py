@@ -0,0 +1,180 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from time import time
+
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api_yamdb.settings import (
+    JWT_CACHE_SIZE,
+    JWT_CACHE_TTL,
+    ROLE_CLAIMS_MAX_AGE
+)
+from reviews.models import MyUser
+from . import metrics
+from .revocation import SESSION_CLAIM, is_revoked
+
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser', 'is_active')
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Токен с username, ролью и флагами is_staff, is_superuser, is_active
+    пользователя. Утверждения копируются и в access-токен, как и
+    SESSION_CLAIM с jti refresh-токена для его отзыва.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[SESSION_CLAIM] = token[api_settings.JTI_CLAIM]
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def get_refresh_token(raw_token):
+    """Проверенный refresh-токен RoleRefreshToken."""
+    try:
+        refresh = RoleRefreshToken(raw_token)
+    except TokenError as error:
+        raise InvalidToken(error.args[0])
+    if SESSION_CLAIM not in refresh:
+        raise InvalidToken('Токен не поддерживает обновление')
+    return refresh
+
+
+def refresh_access_token(refresh):
+    """
+    Новый access-токен по не отозванному refresh-токену. Роль
+    загружается из базы, поэтому её изменение попадает в новый токен.
+    """
+    if is_revoked(refresh):
+        raise InvalidToken('Токен отозван')
+    user = MyUser.objects.only(
+        'id', *ROLE_CLAIMS
+    ).filter(
+        **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]},
+        is_active=True
+    ).first()
+    if user is None:
+        raise InvalidToken('Пользователь не найден')
+    access = refresh.access_token
+    access.set_iat()
+    for claim in ROLE_CLAIMS:
+        access[claim] = getattr(user, claim)
+    return access
+
+
+def get_claims_user(validated_token):
+    """
+    Пользователь из утверждений токена без запроса к базе. Остальные
+    поля отложены (deferred) и загружаются из базы при обращении.
+    """
+    claims = {
+        claim: validated_token[claim] for claim in ROLE_CLAIMS
+    }
+    claims[api_settings.USER_ID_FIELD] = validated_token[
+        api_settings.USER_ID_CLAIM
+    ]
+    # from_db ждёт значения в порядке полей модели.
+    field_names = [
+        field.attname for field in MyUser._meta.concrete_fields
+        if field.attname in claims
+    ]
+    return MyUser.from_db(
+        router.db_for_read(MyUser),
+        field_names,
+        [claims[name] for name in field_names]
+    )
+
+
+def has_fresh_claims(validated_token):
+    """
+    Утверждениям о роли верим ROLE_CLAIMS_MAX_AGE секунд после выдачи
+    токена: так изменение роли действует не позже, чем через это время.
+    """
+    return (
+        all(claim in validated_token for claim in ROLE_CLAIMS)
+        and time() - validated_token['iat'] <= ROLE_CLAIMS_MAX_AGE
+    )
+
+
+class TokenCache:
+    """
+    Ограниченный по размеру LRU-кэш проверенных токенов по sha256
+    от строки токена. Запись живёт не дольше ttl секунд и не дольше
+    срока действия токена (exp), поэтому истёкший токен не вернётся.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                token, expires = entry
+                if time() < expires:
+                    self.entries.move_to_end(key)
+                    metrics.increment('yamdb_jwt_cache_hits_total')
+                    return token
+                del self.entries[key]
+        metrics.increment('yamdb_jwt_cache_misses_total')
+        return None
+
+    def set(self, key, token):
+        expires = min(time() + self.ttl, token['exp'])
+        with self.lock:
+            self.entries[key] = (token, expires)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                metrics.increment('yamdb_jwt_cache_evictions_total')
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT, которая для свежих токенов RoleRefreshToken
+    не загружает пользователя из базы. Для остальных токенов
+    пользователь загружается, как в JWTAuthentication. Проверенные
+    токены кэшируются в token_cache, чтобы не проверять подпись
+    повторно. Отзыв токена проверяется на каждом запросе.
+    """
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.sha256(raw_token).digest()
+        token = token_cache.get(key)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.set(key, token)
+        if is_revoked(token):
+            raise InvalidToken('Токен отозван')
+        return token
+
+    def get_user(self, validated_token):
+        if has_fresh_claims(validated_token):
+            if not validated_token['is_active']:
+                raise AuthenticationFailed(
+                    'Пользователь неактивен', code='user_inactive'
+                )
+            return get_claims_user(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+from api_yamdb.settings import BASE_DIR
+
+PROJECT_PATH = os.path.join(str(BASE_DIR), '')
+DJANGO_PATH = os.path.join(os.sep, 'django', '')
+SITE_PACKAGES = os.path.join('site-packages', '')
+WRAPPERS_CALLER = '_execute_with_wrappers'
+
+
+def short_path(filename):
+    if filename.startswith(PROJECT_PATH):
+        return os.path.relpath(filename, PROJECT_PATH)
+    if SITE_PACKAGES in filename:
+        return filename.split(SITE_PACKAGES, 1)[1]
+    return filename
+
+
+def format_frame(frame):
+    """Место в коде: api/serializers.py:143 ReviewSerializer.validate."""
+    name = frame.f_code.co_name
+    owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+    if owner is not None:
+        owner = owner if isinstance(owner, type) else type(owner)
+        name = f'{owner.__name__}.{name}'
+    return f'{short_path(frame.f_code.co_filename)}:{frame.f_lineno} {name}'
+
+
+def get_call_site(frame=None, skip=()):
+    """
+    Место вызова SQL-запроса: ближайший кадр стека вне Django и
+    ближайший кадр кода проекта. Кадры обёрток выполнения запросов
+    (connection.execute_wrapper) и файлов skip пропускаются.
+    Возвращает пару (library_site, project_site), project_site равен
+    None, если запрос выполнен целиком из кода библиотек.
+    """
+    frame = frame or sys._getframe(1)
+    caller = frame
+    while caller is not None:
+        if caller.f_code.co_name == WRAPPERS_CALLER:
+            frame = caller.f_back
+            break
+        caller = caller.f_back
+    library_site = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in skip and DJANGO_PATH not in filename:
+            site = format_frame(frame)
+            library_site = library_site or site
+            if filename.startswith(PROJECT_PATH):
+                return library_site, site
+        frame = frame.f_back
+    return library_site, None
@@ -0,0 +1,45 @@
+from time import time
+
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from api_yamdb.settings import (
+    CONFIRMATION_CODE_LENGTH,
+    CONFIRMATION_CODE_WINDOW
+)
+
+KEY_SALT = 'api.confirmation.code'
+
+
+def get_window(timestamp=None):
+    """Номер окна времени длиной CONFIRMATION_CODE_WINDOW секунд."""
+    if timestamp is None:
+        timestamp = time()
+    return int(timestamp // CONFIRMATION_CODE_WINDOW)
+
+
+def make_code(user_id, email, window):
+    digest = salted_hmac(
+        KEY_SALT, f'{user_id}:{email}:{window}', algorithm='sha256'
+    ).digest()
+    number = int.from_bytes(digest[:8], 'big') % 10 ** CONFIRMATION_CODE_LENGTH
+    return str(number).zfill(CONFIRMATION_CODE_LENGTH)
+
+
+def make_confirmation_code(user_id, email):
+    """
+    Код подтверждения - HMAC от id, email пользователя и текущего окна
+    времени с SECRET_KEY. Код не хранится в базе.
+    """
+    return make_code(user_id, email, get_window())
+
+
+def check_confirmation_code(user_id, email, code):
+    """
+    Проверяет код текущего и предыдущего окна: код действует от одного
+    до двух окон CONFIRMATION_CODE_WINDOW.
+    """
+    window = get_window()
+    return any(
+        constant_time_compare(make_code(user_id, email, current), str(code))
+        for current in (window, window - 1)
+    )
@@ -0,0 +1,383 @@
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment
+)
+from django.urls import URLResolver, reverse
+from rest_framework.test import APIClient
+
+from api import throttling, urls as api_urls
+from api.authentication import RoleRefreshToken
+from api.confirmation import make_confirmation_code
+from api_yamdb.settings import BENCHMARK_REPORT
+from reviews.management.commands.generate_csv_data import parse_count
+from reviews.models import MyUser, Review
+
+SAFE_METHODS = ('get', 'head', 'options')
+
+
+def iter_url_patterns(patterns):
+    """Обходит вложенные маршруты и отдаёт конечные URLPattern."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def get_methods(pattern):
+    """HTTP-методы, которые обрабатывает маршрут."""
+    actions = getattr(pattern.callback, 'actions', None)
+    if actions is not None:
+        return list(actions)
+    view_class = pattern.callback.view_class
+    return [
+        method for method in view_class.http_method_names
+        if method != 'options' and hasattr(view_class, method)
+    ]
+
+
+def get_percentiles(samples):
+    """p50, p95 и p99 в миллисекундах."""
+    if len(samples) < 2:
+        return samples * 3
+    quantiles = statistics.quantiles(samples, n=100, method='inclusive')
+    return quantiles[49], quantiles[94], quantiles[98]
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Management-команда для нагрузочного тестирования эндпоинтов API."""
+
+    help = (
+        'Используйте эту Management-команду, чтобы измерить задержку '
+        '(p50/p95/p99), количество SQL-запросов и пиковую память каждого '
+        'маршрута api/urls.py на сгенерированных данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews',
+            type=parse_count,
+            default=10000,
+            help='Количество отзывов в тестовых данных: например, 10k.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Количество замеряемых запросов к каждому маршруту.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Количество прогревочных запросов перед замером.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Начальное значение генератора тестовых данных.'
+        )
+        parser.add_argument(
+            '--output',
+            default=BENCHMARK_REPORT,
+            help='Путь к json-отчёту.'
+        )
+        parser.add_argument(
+            '--compare',
+            help=(
+                'Путь к json-отчёту предыдущего замера. Команда завершится '
+                'с ошибкой, если какой-то маршрут стал медленнее.'
+            )
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Допустимый рост p95 относительно предыдущего замера.'
+        )
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help=(
+                'Использовать текущую базу данных и тестовое окружение, '
+                'не создавая тестовую базу (например, внутри pytest).'
+            )
+        )
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        if kwargs['current_db']:
+            report = self.run_benchmark()
+        else:
+            setup_test_environment(debug=False)
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                report = self.run_benchmark()
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+        with open(kwargs['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт сохранён в файл: {kwargs["output"]}')
+        )
+        if kwargs['compare']:
+            self.compare(kwargs['compare'], report)
+
+    def run_benchmark(self):
+        start = time.monotonic()
+        self.seed()
+        self.stdout.write(
+            f'Тестовые данные загружены за {time.monotonic() - start:.1f} с'
+        )
+        client = self.get_client()
+        routes = {}
+        for name, method, path, body in self.get_cases():
+            cache.clear()
+            routes[f'{method.upper()} {name}'] = self.measure(
+                client, method, path, body
+            )
+            self.write_route(f'{method.upper()} {name}', routes)
+        return {
+            'commit': get_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'reviews': self.options['reviews'],
+            'requests': self.options['requests'],
+            'routes': routes,
+        }
+
+    def seed(self):
+        """Генерирует csv файлы и загружает их командой load_csv_com."""
+        with tempfile.TemporaryDirectory() as data_dir:
+            call_command(
+                'generate_csv_data',
+                reviews=self.options['reviews'],
+                seed=self.options['seed'],
+                output=data_dir,
+                stdout=io.StringIO()
+            )
+            call_command(
+                'load_csv_com',
+                path=data_dir,
+                manifest=os.path.join(data_dir, 'manifest.json'),
+                rejects=os.path.join(data_dir, 'rejects'),
+                stdout=io.StringIO()
+            )
+        self.review = Review.objects.annotate(
+            comments_count=Count('comments')
+        ).order_by('-comments_count').select_related('title', 'author')[0]
+        self.title = self.review.title
+        self.user = self.review.author
+        self.user.role = MyUser.ADMIN
+        self.user.save()
+
+    def get_client(self):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=(
+                f'Bearer {RoleRefreshToken.for_user(self.user).access_token}'
+            )
+        )
+        return client
+
+    def get_cases(self):
+        """
+        Запросы для каждого маршрута api/urls.py: GET, если маршрут его
+        поддерживает, иначе первый из поддерживаемых методов.
+        """
+        title = self.title
+        review = self.review
+        comment = review.comments.first()
+        category = title.category
+        samples = {
+            'title': {'pk': title.pk},
+            'category': {'slug': category.slug},
+            'genre': {'slug': title.genre.first().slug},
+            'review': {'title_id': title.pk, 'pk': review.pk},
+            'comment': {
+                'title_id': title.pk,
+                'review_id': review.pk,
+                'pk': comment.pk if comment else 0,
+            },
+            'user': {'username': self.user.username},
+        }
+        bodies = {
+            'signup': {
+                'username': 'benchmark', 'email': 'benchmark@yamdb.fake'
+            },
+            'token': {
+                'username': self.user.username,
+                'confirmation_code': make_confirmation_code(
+                    self.user.pk, self.user.email
+                ),
+            },
+            'token-refresh': {
+                'refresh': str(RoleRefreshToken.for_user(self.user)),
+            },
+            'token-revoke': {
+                'refresh': str(RoleRefreshToken.for_user(self.user)),
+            },
+        }
+        basenames = sorted(
+            (basename for _, _, basename in api_urls.router_v1.registry),
+            key=len, reverse=True
+        )
+        for pattern in iter_url_patterns(api_urls.urlpatterns):
+            if 'format' in pattern.pattern.regex.groupindex:
+                continue
+            name = pattern.name
+            basename = next(
+                (basename for basename in basenames
+                 if name.startswith(f'{basename}-')),
+                None
+            )
+            kwargs = {
+                key: samples[basename][key]
+                for key in pattern.pattern.regex.groupindex
+            }
+            methods = get_methods(pattern)
+            method = 'get' if 'get' in methods else methods[0]
+            yield (
+                name, method, reverse(name, kwargs=kwargs),
+                bodies.get(name)
+            )
+
+    def perform(self, client, method, path, body):
+        """
+        Выполняет запрос и дочитывает потоковый ответ.
+        Изменяющие запросы выполняются в транзакции, которая
+        откатывается, чтобы замеры не влияли друг на друга.
+        """
+        if method in SAFE_METHODS:
+            return self.request(client, method, path, body)
+        # Повторные запросы к /auth/ не должны упираться в ограничение
+        # частоты: замеряется обработка запроса, а не ответ 429.
+        throttling.reset()
+        with transaction.atomic():
+            response = self.request(client, method, path, body)
+            transaction.set_rollback(True)
+        return response
+
+    def request(self, client, method, path, body):
+        response = client.generic(
+            method.upper(),
+            path,
+            data=json.dumps(body) if body is not None else '',
+            content_type='application/json'
+        )
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def measure(self, client, method, path, body):
+        for _ in range(self.options['warmup']):
+            self.perform(client, method, path, body)
+        samples = []
+        for _ in range(self.options['requests']):
+            start = time.perf_counter()
+            self.perform(client, method, path, body)
+            samples.append((time.perf_counter() - start) * 1000)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.perform(client, method, path, body)
+        query_count = len(queries)
+        tracemalloc.start()
+        try:
+            self.perform(client, method, path, body)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        p50, p95, p99 = get_percentiles(samples)
+        return {
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'mean_ms': round(statistics.fmean(samples), 3),
+            'queries': query_count,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def write_route(self, route, routes):
+        result = routes[route]
+        line = (
+            f'{route:<32} {result["status"]} '
+            f'p50 {result["p50_ms"]:8.2f} мс  '
+            f'p95 {result["p95_ms"]:8.2f} мс  '
+            f'p99 {result["p99_ms"]:8.2f} мс  '
+            f'запросов {result["queries"]:3}  '
+            f'память {result["peak_memory_kb"]:9.1f} КБ'
+        )
+        if result['status'] >= 400:
+            line = self.style.WARNING(line)
+        self.stdout.write(line)
+
+    def compare(self, baseline_path, report):
+        """
+        Сравнивает отчёт с предыдущим замером: маршрут считается
+        замедлившимся, если его p95 вырос больше порога или стало
+        больше SQL-запросов.
+        """
+        with open(baseline_path, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        self.stdout.write(
+            f'Сравнение с замером {baseline.get("commit")} '
+            f'от {baseline.get("created")}:'
+        )
+        regressions = []
+        for route, result in report['routes'].items():
+            previous = baseline['routes'].get(route)
+            if previous is None:
+                self.stdout.write(f'{route:<32} новый маршрут')
+                continue
+            change = result['p95_ms'] / max(previous['p95_ms'], 1e-6) - 1
+            line = (
+                f'{route:<32} p95 {previous["p95_ms"]:8.2f} -> '
+                f'{result["p95_ms"]:8.2f} мс ({change:+.0%})  '
+                f'запросов {previous["queries"]} -> {result["queries"]}'
+            )
+            if (
+                change > self.options['threshold']
+                or result['queries'] > previous['queries']
+            ):
+                regressions.append(route)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f'Замедлились маршруты: {", ".join(regressions)}'
+            )
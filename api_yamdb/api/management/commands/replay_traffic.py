@@ -0,0 +1,587 @@
+import json
+import os
+import random
+import re
+import statistics
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import Resolver404, resolve
+
+from api.management.commands.benchmark_api import get_percentiles
+from api.server_timing import parse_header
+
+VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+CAPTURE_LOCAL_PATTERN = re.compile(
+    r'const (\w+) = _\.get\(responseData, ["\'](\w+)["\']\)'
+)
+CAPTURE_SET_PATTERN = re.compile(
+    r'pm\.collectionVariables\.set\(["\'](\w+)["\'], (\w+)\)'
+)
+CONFIRMATION_CODE_PATTERN = re.compile(r'Ваш код: (\w+)')
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+SIGNUP_PATH = '/api/v1/auth/signup/'
+TOKEN_PATH = '/api/v1/auth/token/'
+REQUEST_TIMEOUT = 30
+
+
+def iter_postman_items(items):
+    """Обходит вложенные папки коллекции и отдаёт запросы."""
+    for item in items:
+        if 'item' in item:
+            yield from iter_postman_items(item['item'])
+        else:
+            yield item
+
+
+def get_captures(item):
+    """
+    Переменные, которые тест-скрипт запроса сохраняет из ответа:
+    pm.collectionVariables.set("adminTitle", titleId), где
+    const titleId = _.get(responseData, "id").
+    """
+    script = '\n'.join(
+        line
+        for event in item.get('event', ())
+        if event.get('listen') == 'test'
+        for line in event['script'].get('exec', ())
+    )
+    fields = dict(CAPTURE_LOCAL_PATTERN.findall(script))
+    return {
+        variable: fields[local]
+        for variable, local in CAPTURE_SET_PATTERN.findall(script)
+        if local in fields
+    }
+
+
+def get_auth_variable(request):
+    """Имя переменной с токеном для авторизации по Bearer."""
+    auth = request.get('auth') or {}
+    if auth.get('type') != 'bearer':
+        return None
+    for option in auth.get('bearer', ()):
+        match = VARIABLE_PATTERN.fullmatch(option.get('value', ''))
+        if option.get('key') == 'token' and match:
+            return match.group(1)
+    return None
+
+
+def load_postman(path):
+    """
+    Превращает postman-коллекцию в сценарий: запросы с путём,
+    телом, переменной токена и переменными, сохраняемыми из ответа.
+    Одинаковые запросы объединяются, а их вес равен числу повторов.
+    """
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    variables = {
+        variable['key']: variable.get('value', '')
+        for variable in collection.get('variable', ())
+    }
+    scenario = []
+    for item in iter_postman_items(collection['item']):
+        request = item['request']
+        url = request['url']
+        url = urlsplit(url['raw'] if isinstance(url, dict) else url)
+        body = request.get('body') or {}
+        scenario.append({
+            'name': item.get('name'),
+            'method': request['method'],
+            'path': url.path + (f'?{url.query}' if url.query else ''),
+            'body': body.get('raw') if body.get('mode') == 'raw' else None,
+            'auth': get_auth_variable(request),
+            'captures': get_captures(item),
+            'weight': 1,
+        })
+    return variables, merge_requests(scenario)
+
+
+def load_jsonl(path):
+    """
+    Читает записанные запросы: по одному json-объекту в строке с ключами
+    method, path и необязательными body, auth, weight и name.
+    auth - роль (admin) или имя переменной с токеном (adminToken).
+    """
+    scenario = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record.get('body')
+            auth = record.get('auth')
+            if auth and not auth.endswith('Token'):
+                auth = f'{auth}Token'
+            scenario.append({
+                'name': record.get('name'),
+                'method': record.get('method', 'GET').upper(),
+                'path': record['path'],
+                'body': (
+                    body if body is None or isinstance(body, str)
+                    else json.dumps(body, ensure_ascii=False)
+                ),
+                'auth': auth,
+                'captures': record.get('captures', {}),
+                'weight': record.get('weight', 1),
+            })
+    return {}, merge_requests(scenario)
+
+
+def merge_requests(scenario):
+    merged = {}
+    for request in scenario:
+        key = (
+            request['method'], request['path'], request['body'],
+            request['auth']
+        )
+        if key in merged:
+            merged[key]['weight'] += request['weight']
+            merged[key]['captures'].update(request['captures'])
+        else:
+            merged[key] = request
+    return list(merged.values())
+
+
+def render(template, variables):
+    if template is None:
+        return None
+    return VARIABLE_PATTERN.sub(
+        lambda match: str(variables.get(match.group(1), match.group(0))),
+        template
+    )
+
+
+def is_resolved(request, variables):
+    """Все ли переменные запроса известны."""
+    names = VARIABLE_PATTERN.findall(
+        f'{request["path"]} {request["body"] or ""}'
+    )
+    if request['auth']:
+        names.append(request['auth'])
+    return all(name in variables for name in names)
+
+
+def get_route(method, path):
+    """Маршрут запроса для отчёта: имя url или путь."""
+    path = urlsplit(path).path
+    try:
+        name = resolve(path).url_name
+    except Resolver404:
+        name = None
+    return f'{method} {name or path}'
+
+
+def read_confirmation_code(email, since, timeout):
+    """
+    Ищет код подтверждения в письмах, которые сервер сохраняет в
+    EMAIL_FILE_PATH, и ждёт письмо не дольше timeout секунд.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            entries = sorted(
+                os.scandir(settings.EMAIL_FILE_PATH),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True
+            )
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if entry.stat().st_mtime < since:
+                break
+            with open(entry.path, encoding='utf-8') as file:
+                for message in file.read().split('-' * 79):
+                    match = CONFIRMATION_CODE_PATTERN.search(message)
+                    if f'To: {email}' in message and match:
+                        return match.group(1)
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.1)
+
+
+def get_histogram(samples):
+    """Количество запросов по корзинам задержки LATENCY_BUCKETS_MS."""
+    counts = Counter(
+        bisect_left(LATENCY_BUCKETS_MS, sample) for sample in samples
+    )
+    labels = [f'<={bucket}' for bucket in LATENCY_BUCKETS_MS]
+    labels.append(f'>{LATENCY_BUCKETS_MS[-1]}')
+    return {
+        label: counts[index] for index, label in enumerate(labels)
+        if counts[index]
+    }
+
+
+class Command(BaseCommand):
+    """Management-команда для нагрузки API записанным трафиком."""
+
+    help = (
+        'Используйте эту Management-команду, чтобы воспроизвести запросы '
+        'postman-коллекции или записанные в jsonl запросы с заданной '
+        'конкурентностью против запущенного сервера и получить '
+        'пропускную способность и гистограммы задержек по маршрутам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenario',
+            help=(
+                'Postman-коллекция (.json) или записанные запросы (.jsonl).'
+            )
+        )
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='Адрес запущенного сервера.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Количество одновременно отправляющих запросы потоков.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Длительность нагрузки в секундах.'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            help='Общее количество запросов вместо длительности.'
+        )
+        parser.add_argument(
+            '--read-weight',
+            type=float,
+            default=1,
+            help='Множитель веса GET-запросов сценария.'
+        )
+        parser.add_argument(
+            '--account',
+            action='append',
+            default=[],
+            metavar='ROLE=USERNAME:EMAIL',
+            help=(
+                'Учётная запись, для которой токен получается через '
+                'signup и token. По умолчанию берутся переменные '
+                '<role>Username и <role>Email коллекции.'
+            )
+        )
+        parser.add_argument(
+            '--token',
+            action='append',
+            default=[],
+            metavar='ROLE=JWT',
+            help='Готовый токен для роли вместо получения через signup.'
+        )
+        parser.add_argument(
+            '--email-timeout',
+            type=float,
+            default=5,
+            help='Сколько секунд ждать письмо с кодом подтверждения.'
+        )
+        parser.add_argument(
+            '--no-setup',
+            action='store_true',
+            help=(
+                'Не выполнять перед нагрузкой запросы, сохраняющие '
+                'переменные из ответа (создание произведений, отзывов...).'
+            )
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Начальное значение генератора выбора запросов.'
+        )
+        parser.add_argument(
+            '--export-scenario',
+            help=(
+                'Сохранить взвешенный сценарий в jsonl и завершить работу '
+                'без нагрузки.'
+            )
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к json-отчёту.'
+        )
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        self.base_url = kwargs['base_url'].rstrip('/')
+        if kwargs['scenario'].endswith('.jsonl'):
+            variables, scenario = load_jsonl(kwargs['scenario'])
+        else:
+            variables, scenario = load_postman(kwargs['scenario'])
+        for request in scenario:
+            if request['method'] == 'GET':
+                request['weight'] *= kwargs['read_weight']
+        if kwargs['export_scenario']:
+            self.export_scenario(kwargs['export_scenario'], scenario)
+            return
+        session = requests.Session()
+        self.authenticate(session, scenario, variables)
+        if not kwargs['no_setup']:
+            self.setup(session, scenario, variables)
+        resolved = [
+            request for request in scenario
+            if is_resolved(request, variables) and request['weight'] > 0
+        ]
+        if len(resolved) < len(scenario):
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено запросов с неизвестными переменными: '
+                f'{len(scenario) - len(resolved)}')
+            )
+        if not resolved:
+            raise CommandError('В сценарии нет запросов для нагрузки.')
+        results, elapsed = self.run_load(resolved, variables)
+        report = self.build_report(results, elapsed)
+        self.write_report(report)
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=4)
+
+    def export_scenario(self, path, scenario):
+        with open(path, 'w', encoding='utf-8') as file:
+            for request in scenario:
+                file.write(json.dumps(request, ensure_ascii=False) + '\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'Сценарий из {len(scenario)} запросов сохранён в файл: {path}')
+        )
+
+    def get_accounts(self, scenario, variables):
+        """
+        Учётные записи по ролям: из переменных коллекции <role>Username и
+        <role>Email для ролей, токены которых нужны сценарию, и --account.
+        """
+        roles = {
+            request['auth'][:-len('Token')] for request in scenario
+            if request['auth'] and request['auth'].endswith('Token')
+        }
+        accounts = {
+            role: (
+                variables.get(f'{role}Username'),
+                variables.get(f'{role}Email')
+            )
+            for role in roles
+        }
+        for option in self.options['account']:
+            role, _, credentials = option.partition('=')
+            username, _, email = credentials.partition(':')
+            accounts[role] = (username, email)
+        return {
+            role: account for role, account in accounts.items()
+            if all(account)
+        }
+
+    def authenticate(self, session, scenario, variables):
+        """
+        Получает JWT для каждой роли: signup, код подтверждения из письма
+        и token. Токены и коды сохраняются в переменные <role>Token и
+        <role>ConfirmationCode.
+        """
+        for option in self.options['token']:
+            role, _, token = option.partition('=')
+            variables[f'{role}Token'] = token
+        accounts = self.get_accounts(scenario, variables)
+        for role, (username, email) in accounts.items():
+            if f'{role}Token' in variables:
+                continue
+            since = time.time() - 1
+            response = session.post(
+                self.base_url + SIGNUP_PATH,
+                json={'username': username, 'email': email},
+                timeout=REQUEST_TIMEOUT
+            )
+            code = read_confirmation_code(
+                email, since, self.options['email_timeout']
+            )
+            if response.status_code != 200 or code is None:
+                self.stderr.write(self.style.WARNING(
+                    f'Не удалось зарегистрировать {role}: {username}')
+                )
+                continue
+            variables[f'{role}ConfirmationCode'] = code
+            response = session.post(
+                self.base_url + TOKEN_PATH,
+                json={'username': username, 'confirmation_code': code},
+                timeout=REQUEST_TIMEOUT
+            )
+            token = response.json().get('token') if response.ok else None
+            if token is None:
+                self.stderr.write(self.style.WARNING(
+                    f'Не удалось получить токен для {role}: {username}')
+                )
+                continue
+            variables[f'{role}Token'] = token
+            self.stdout.write(f'Получен токен для {role}: {username}')
+
+    def setup(self, session, scenario, variables):
+        """
+        По одному разу по порядку выполняет запросы, которые сохраняют
+        переменные из ответа, чтобы id созданных объектов были известны
+        запросам нагрузки.
+        """
+        for request in scenario:
+            if not request['captures'] or not is_resolved(request, variables):
+                continue
+            response = self.send(session, request, variables)
+            try:
+                data = response.json()
+            except ValueError:
+                continue
+            if not response.ok or not isinstance(data, dict):
+                continue
+            for variable, field in request['captures'].items():
+                if isinstance(data.get(field), (str, int)):
+                    variables.setdefault(variable, data[field])
+
+    def send(self, session, request, variables):
+        headers = {}
+        if request['auth']:
+            headers['Authorization'] = f'Bearer {variables[request["auth"]]}'
+        body = render(request['body'], variables)
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        return session.request(
+            request['method'],
+            self.base_url + render(request['path'], variables),
+            data=body.encode() if body is not None else None,
+            headers=headers,
+            timeout=REQUEST_TIMEOUT
+        )
+
+    def run_load(self, scenario, variables):
+        """
+        Отправляет случайные по весам запросы сценария из нескольких
+        потоков, пока не истечёт время или не кончатся запросы.
+        """
+        cum_weights = list(accumulate(
+            request['weight'] for request in scenario
+        ))
+        routes = [
+            get_route(request['method'], render(request['path'], variables))
+            for request in scenario
+        ]
+        indexes = range(len(scenario))
+        generator = random.Random(self.options['seed'])
+        remaining = self.options['requests']
+        lock = threading.Lock()
+        start = time.monotonic()
+        deadline = start + self.options['duration']
+
+        def take():
+            nonlocal remaining
+            if remaining is None:
+                return time.monotonic() < deadline
+            with lock:
+                remaining -= 1
+                return remaining >= 0
+
+        def worker(worker_seed):
+            choose = random.Random(worker_seed)
+            session = requests.Session()
+            results = []
+            while take():
+                index = choose.choices(indexes, cum_weights=cum_weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = self.send(session, scenario[index], variables)
+                except requests.RequestException:
+                    status, timing = None, {}
+                else:
+                    status = response.status_code
+                    timing = parse_header(
+                        response.headers.get('Server-Timing', '')
+                    )
+                results.append((
+                    routes[index],
+                    status,
+                    (time.perf_counter() - started) * 1000,
+                    timing
+                ))
+            return results
+
+        with ThreadPoolExecutor(self.options['concurrency']) as executor:
+            futures = [
+                executor.submit(worker, generator.random())
+                for _ in range(self.options['concurrency'])
+            ]
+            results = [
+                result for future in futures for result in future.result()
+            ]
+        return results, time.monotonic() - start
+
+    def build_report(self, results, elapsed):
+        by_route = defaultdict(list)
+        timings = defaultdict(lambda: defaultdict(list))
+        for route, status, latency, timing in results:
+            by_route[route].append((status, latency))
+            for phase, duration in timing.items():
+                timings[route][phase].append(duration)
+        routes = {}
+        for route, samples in sorted(by_route.items()):
+            latencies = [latency for _, latency in samples]
+            p50, p95, p99 = get_percentiles(latencies)
+            routes[route] = {
+                'requests': len(samples),
+                'rps': round(len(samples) / elapsed, 2),
+                'errors': sum(
+                    1 for status, _ in samples
+                    if status is None or status >= 500
+                ),
+                'statuses': dict(Counter(
+                    str(status) for status, _ in samples
+                )),
+                'p50_ms': round(p50, 3),
+                'p95_ms': round(p95, 3),
+                'p99_ms': round(p99, 3),
+                'histogram_ms': get_histogram(latencies),
+                'server_timing_ms': {
+                    phase: round(statistics.fmean(durations), 3)
+                    for phase, durations in timings[route].items()
+                },
+            }
+        return {
+            'base_url': self.base_url,
+            'concurrency': self.options['concurrency'],
+            'elapsed_s': round(elapsed, 3),
+            'requests': len(results),
+            'rps': round(len(results) / elapsed, 2),
+            'routes': routes,
+        }
+
+    def write_report(self, report):
+        self.stdout.write(
+            f'Запросов: {report["requests"]} за {report["elapsed_s"]} с, '
+            f'{report["rps"]} запр/с при {report["concurrency"]} потоках'
+        )
+        for route, result in report['routes'].items():
+            line = (
+                f'{route:<32} {result["requests"]:6} запр. '
+                f'{result["rps"]:8.1f} запр/с  '
+                f'p50 {result["p50_ms"]:8.2f} мс  '
+                f'p95 {result["p95_ms"]:8.2f} мс  '
+                f'p99 {result["p99_ms"]:8.2f} мс  '
+                f'ошибок {result["errors"]}'
+            )
+            if result['errors']:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+            self.stdout.write('    ' + '  '.join(
+                f'{label} мс: {count}'
+                for label, count in result['histogram_ms'].items()
+            ))
+            if result['server_timing_ms']:
+                self.stdout.write('    Server-Timing, среднее: ' + '  '.join(
+                    f'{phase} {duration:.2f} мс'
+                    for phase, duration in result['server_timing_ms'].items()
+                ))
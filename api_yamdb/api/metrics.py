@@ -0,0 +1,225 @@
+import threading
+import weakref
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class RouteStats:
+    """Накопленные метрики одного маршрута и HTTP-метода."""
+
+    __slots__ = (
+        'statuses', 'latency_buckets', 'latency_sum', 'size_buckets',
+        'size_sum', 'size_count', 'queries', 'db_time'
+    )
+
+    def __init__(self):
+        self.statuses = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.size_buckets = [0] * (len(SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+        self.size_count = 0
+        self.queries = 0
+        self.db_time = 0.0
+
+    def merge(self, other):
+        # Снимок list(...) атомарен: поток-владелец может добавлять
+        # ключи во время чтения метрик.
+        for status, count in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        for index, count in enumerate(other.latency_buckets):
+            self.latency_buckets[index] += count
+        for index, count in enumerate(other.size_buckets):
+            self.size_buckets[index] += count
+        self.latency_sum += other.latency_sum
+        self.size_sum += other.size_sum
+        self.size_count += other.size_count
+        self.queries += other.queries
+        self.db_time += other.db_time
+
+
+class Accumulator:
+    """
+    Метрики, накопленные одним потоком. Поток пишет только в свой
+    накопитель, поэтому запись обходится без блокировок.
+    """
+
+    __slots__ = ('routes', 'counters')
+
+    def __init__(self):
+        self.routes = {}
+        self.counters = {}
+
+    def merge(self, other):
+        for key, stats in list(other.routes.items()):
+            self.routes.setdefault(key, RouteStats()).merge(stats)
+        for name, value in list(other.counters.items()):
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+class AccumulatorHandle:
+    """Хранится в threading.local и живёт, пока жив поток."""
+
+    __slots__ = ('accumulator', '__weakref__')
+
+    def __init__(self, accumulator):
+        self.accumulator = accumulator
+
+
+class Registry:
+    """
+    Реестр накопителей всех потоков. Блокировка нужна только при
+    появлении и завершении потока и при чтении метрик: накопитель
+    завершившегося потока переносится в общий накопитель retired.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.accumulators = set()
+        self.retired = Accumulator()
+
+    def get(self):
+        handle = getattr(self.local, 'handle', None)
+        if handle is None:
+            accumulator = Accumulator()
+            handle = AccumulatorHandle(accumulator)
+            with self.lock:
+                self.accumulators.add(accumulator)
+            weakref.finalize(handle, self.retire, accumulator)
+            self.local.handle = handle
+        return handle.accumulator
+
+    def retire(self, accumulator):
+        with self.lock:
+            self.accumulators.discard(accumulator)
+            self.retired.merge(accumulator)
+
+    def collect(self):
+        """Сумма метрик всех потоков."""
+        total = Accumulator()
+        with self.lock:
+            total.merge(self.retired)
+            for accumulator in list(self.accumulators):
+                total.merge(accumulator)
+        return total
+
+    def reset(self):
+        with self.lock:
+            self.retired = Accumulator()
+            for accumulator in self.accumulators:
+                accumulator.routes.clear()
+                accumulator.counters.clear()
+
+
+registry = Registry()
+
+
+def observe_request(route, method, status, duration, size, queries, db_time):
+    """Учитывает запрос к маршруту. size равен None для потоковых ответов."""
+    routes = registry.get().routes
+    stats = routes.get((route, method))
+    if stats is None:
+        stats = routes[(route, method)] = RouteStats()
+    stats.statuses[status] = stats.statuses.get(status, 0) + 1
+    stats.latency_buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+    stats.latency_sum += duration
+    if size is not None:
+        stats.size_buckets[bisect_left(SIZE_BUCKETS, size)] += 1
+        stats.size_sum += size
+        stats.size_count += 1
+    stats.queries += queries
+    stats.db_time += db_time
+
+
+def increment(name, value=1):
+    """Увеличивает счётчик name без меток."""
+    counters = registry.get().counters
+    counters[name] = counters.get(name, 0) + value
+
+
+def escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def format_labels(**labels):
+    return '{' + ','.join(
+        f'{name}="{escape(value)}"' for name, value in labels.items()
+    ) + '}'
+
+
+def format_histogram(name, labels, bounds, buckets, total, count):
+    lines = []
+    cumulative = 0
+    for bound, bucket in zip((*bounds, '+Inf'), buckets):
+        cumulative += bucket
+        lines.append(
+            f'{name}_bucket{format_labels(**labels, le=bound)} {cumulative}'
+        )
+    lines.append(f'{name}_sum{format_labels(**labels)} {total}')
+    lines.append(f'{name}_count{format_labels(**labels)} {count}')
+    return lines
+
+
+def render():
+    """Метрики всех потоков в текстовом формате Prometheus."""
+    total = registry.collect()
+    requests = [
+        '# HELP yamdb_http_requests_total Количество запросов.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    latency = [
+        '# HELP yamdb_http_request_duration_seconds Время обработки '
+        'запроса.',
+        '# TYPE yamdb_http_request_duration_seconds histogram',
+    ]
+    sizes = [
+        '# HELP yamdb_http_response_size_bytes Размер ответа.',
+        '# TYPE yamdb_http_response_size_bytes histogram',
+    ]
+    queries = [
+        '# HELP yamdb_db_queries_total Количество SQL-запросов.',
+        '# TYPE yamdb_db_queries_total counter',
+    ]
+    db_time = [
+        '# HELP yamdb_db_query_duration_seconds_total Время выполнения '
+        'SQL-запросов.',
+        '# TYPE yamdb_db_query_duration_seconds_total counter',
+    ]
+    for (route, method), stats in sorted(total.routes.items()):
+        labels = {'route': route, 'method': method}
+        for status, count in sorted(stats.statuses.items()):
+            requests.append(
+                'yamdb_http_requests_total'
+                f'{format_labels(**labels, status=status)} {count}'
+            )
+        latency.extend(format_histogram(
+            'yamdb_http_request_duration_seconds', labels, LATENCY_BUCKETS,
+            stats.latency_buckets, stats.latency_sum,
+            sum(stats.latency_buckets)
+        ))
+        sizes.extend(format_histogram(
+            'yamdb_http_response_size_bytes', labels, SIZE_BUCKETS,
+            stats.size_buckets, stats.size_sum, stats.size_count
+        ))
+        queries.append(
+            f'yamdb_db_queries_total{format_labels(**labels)} '
+            f'{stats.queries}'
+        )
+        db_time.append(
+            'yamdb_db_query_duration_seconds_total'
+            f'{format_labels(**labels)} {stats.db_time}'
+        )
+    counters = []
+    for name, value in sorted(total.counters.items()):
+        counters.extend((f'# TYPE {name} counter', f'{name} {value}'))
+    return '\n'.join(
+        requests + latency + sizes + queries + db_time + counters
+    ) + '\n'
@@ -0,0 +1,184 @@
+from time import perf_counter
+
+from django.db import connection
+
+from api_yamdb.settings import (
+    PROFILING_DIR,
+    PROFILING_ENABLED,
+    PROFILING_SAMPLE_INTERVAL,
+    SERVER_TIMING_ENABLED,
+    SLOW_QUERY_LOG_THRESHOLD
+)
+from . import metrics
+from .profiling import PROFILE_HEADER, is_admin, profile_request
+from .server_timing import ServerTiming, current_timing
+from .slow_queries import SlowQueryLogger
+
+
+class QueryTimer:
+    """Обёртка выполнения запросов, считающая их количество и время."""
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - start
+
+
+class StreamingQueries:
+    """
+    Содержимое потокового ответа, при чтении которого SQL-запросы идут
+    через обёртку wrapper: выгрузки выполняют запросы уже после выхода
+    из middleware. Обёртка ставится только на время получения очередной
+    части, поэтому обёртки вложенных middleware снимаются по порядку.
+    on_close вызывается один раз при закрытии ответа.
+    """
+
+    def __init__(self, content, wrapper, on_close=None):
+        self.content = iter(content)
+        self.wrapper = wrapper
+        self.on_close = on_close
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with connection.execute_wrapper(self.wrapper):
+            return next(self.content)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if hasattr(self.content, 'close'):
+            self.content.close()
+        if self.on_close is not None:
+            self.on_close()
+
+
+class MetricsMiddleware:
+    """
+    Собирает по маршрутам количество запросов, время обработки, размер
+    ответа, количество и время SQL-запросов для эндпоинта /metrics.
+    Маршрут - имя url из resolver_match: title-list, review-detail.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        if response.streaming:
+            # Потоковый ответ учитывается после чтения содержимого
+            # вместе с его SQL-запросами.
+            response.streaming_content = StreamingQueries(
+                response.streaming_content, timer,
+                lambda: self.observe(request, response, timer, start)
+            )
+        else:
+            self.observe(request, response, timer, start)
+        return response
+
+    def observe(self, request, response, timer, start):
+        duration = perf_counter() - start
+        match = request.resolver_match
+        if match is None:
+            route = 'unmatched'
+        else:
+            route = match.url_name or match.route
+        metrics.observe_request(
+            route,
+            request.method,
+            response.status_code,
+            duration,
+            None if response.streaming else len(response.content),
+            timer.count,
+            timer.duration
+        )
+
+
+class SlowQueryLogMiddleware:
+    """
+    Пишет в лог SQL-запросы дольше SLOW_QUERY_LOG_THRESHOLD секунд.
+    Включается настройкой: при None запросы не оборачиваются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if SLOW_QUERY_LOG_THRESHOLD is None:
+            return self.get_response(request)
+        logger = SlowQueryLogger(request, SLOW_QUERY_LOG_THRESHOLD)
+        with connection.execute_wrapper(logger):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = StreamingQueries(
+                response.streaming_content, logger
+            )
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Добавляет к ответу заголовок Server-Timing со временем фаз:
+    auth, perm, db, serialize, render и total. Фазы замеряются хуками
+    из api/server_timing.py, время SQL-запросов - обёрткой выполнения.
+    Заголовки отправляются до содержимого потокового ответа, поэтому
+    запросы при его чтении в заголовок не попадают.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not SERVER_TIMING_ENABLED:
+            return self.get_response(request)
+        timing = ServerTiming()
+        token = current_timing.set(timing)
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        response['Server-Timing'] = timing.header(perf_counter() - start)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос администратора с заголовком X-Profile: cprofile
+    или X-Profile: sample. Включается настройкой PROFILING_ENABLED,
+    остальные запросы выполняются без профилировщика.
+    """
+
+    modes = ('cprofile', 'sample')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(PROFILE_HEADER)
+        if (
+            not PROFILING_ENABLED
+            or mode not in self.modes
+            or not is_admin(request)
+        ):
+            return self.get_response(request)
+        return profile_request(
+            mode, self.get_response, request, PROFILING_DIR,
+            PROFILING_SAMPLE_INTERVAL
+        )
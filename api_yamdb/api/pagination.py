@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по дате публикации, от новых записей к старым.
+    Опирается на индексы по pub_date и не считает общее число записей.
+    """
+    ordering = ('-pub_date', '-id')
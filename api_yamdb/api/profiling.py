@@ -0,0 +1,121 @@
+import cProfile
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .call_site import short_path
+from .permissions import IsAdmin
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+REQUEST_ID_HEADER = 'HTTP_X_REQUEST_ID'
+REQUEST_ID_PATTERN = re.compile(r'^[\w-]{1,64}$')
+
+
+def get_request_id(request):
+    """
+    Идентификатор запроса из заголовка X-Request-ID. Если заголовка
+    нет или он не годится для имени файла, создаётся новый.
+    """
+    request_id = request.META.get(REQUEST_ID_HEADER, '')
+    if REQUEST_ID_PATTERN.match(request_id):
+        return request_id
+    return uuid.uuid4().hex
+
+
+def is_admin(request):
+    """Проверяет токен запроса так же, как это сделает вью DRF."""
+    drf_request = Request(request, authenticators=[
+        authentication() for authentication
+        in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ])
+    try:
+        return IsAdmin().has_permission(drf_request, None)
+    except APIException:
+        return False
+
+
+def collapse_stack(frame):
+    """Стек кадров в формате collapsed stacks: внешний;...;внутренний."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f'{getattr(code, "co_qualname", code.co_name)} '
+            f'({short_path(code.co_filename)}:{code.co_firstlineno})'
+        )
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """
+    Сэмплирующий профилировщик: отдельный поток раз в interval секунд
+    снимает стек потока, обрабатывающего запрос.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+def run_cprofile(get_response, request, path):
+    profiler = cProfile.Profile()
+    response = profiler.runcall(get_response, request)
+    profiler.dump_stats(path)
+    return response
+
+
+def run_sampler(get_response, request, path, interval):
+    with StackSampler(interval) as sampler:
+        response = get_response(request)
+    sampler.dump(path)
+    return response
+
+
+def profile_request(mode, get_response, request, directory, interval):
+    """
+    Выполняет запрос под профилировщиком mode и сохраняет результат в
+    directory: cprofile - файл <id>.pstats для pstats и snakeviz,
+    sample - файл <id>.collapsed для flamegraph.pl и speedscope.
+    """
+    request_id = get_request_id(request)
+    directory.mkdir(parents=True, exist_ok=True)
+    if mode == 'cprofile':
+        response = run_cprofile(
+            get_response, request, directory / f'{request_id}.pstats'
+        )
+    else:
+        response = run_sampler(
+            get_response, request, directory / f'{request_id}.collapsed',
+            interval
+        )
+    response['X-Profile-Id'] = request_id
+    return response
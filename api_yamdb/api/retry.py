@@ -0,0 +1,60 @@
+import random
+from functools import wraps
+from time import sleep
+
+from django.db import OperationalError, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api_yamdb.settings import (
+    LOCK_RETRY_ATTEMPTS,
+    LOCK_RETRY_BASE_DELAY,
+    LOCK_RETRY_MAX_DELAY
+)
+from . import metrics
+
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+class DatabaseBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'База данных занята, повторите запрос позже.'
+    default_code = 'database_busy'
+
+
+def is_lock_error(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+def get_delay(attempt):
+    """Случайная пауза перед повтором attempt (full jitter)."""
+    return random.uniform(
+        0, min(LOCK_RETRY_MAX_DELAY, LOCK_RETRY_BASE_DELAY * 2 ** attempt)
+    )
+
+
+def retry_on_lock(function):
+    """
+    Выполняет function в транзакции и повторяет её, если SQLite не дал
+    блокировку. Транзакция откатывается целиком, поэтому повтор не
+    записывает данные дважды. Внутри чужой транзакции повтор невозможен,
+    и function выполняется один раз. После LOCK_RETRY_ATTEMPTS попыток
+    возвращается ответ 503.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if connection.in_atomic_block:
+            return function(*args, **kwargs)
+        for attempt in range(LOCK_RETRY_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return function(*args, **kwargs)
+            except OperationalError as error:
+                if not is_lock_error(error):
+                    raise
+                if attempt + 1 == LOCK_RETRY_ATTEMPTS:
+                    metrics.increment('yamdb_db_lock_give_ups_total')
+                    raise DatabaseBusy from error
+                metrics.increment('yamdb_db_lock_retries_total')
+                sleep(get_delay(attempt))
+    return wrapper
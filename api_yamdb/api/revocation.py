@@ -0,0 +1,160 @@
+import hashlib
+import math
+import threading
+from time import time
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from api_yamdb.settings import (
+    REVOCATION_FILTER_CAPACITY,
+    REVOCATION_FILTER_ERROR_RATE,
+    REVOCATION_FILTER_REFRESH
+)
+from reviews.models import RevokedToken
+from . import metrics
+
+# Утверждение с jti refresh-токена, по которому выдан токен: отзыв
+# refresh-токена отзывает и его access-токены.
+SESSION_CLAIM = 'sid'
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: отвечает «точно нет» или «возможно есть». Количество
+    бит и хеш-функций рассчитывается по capacity и error_rate.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.bits_count = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes_count = max(1, round(
+            self.bits_count / capacity * math.log(2)
+        ))
+        self.bits = bytearray((self.bits_count + 7) // 8)
+
+    def positions(self, value):
+        digest = hashlib.sha256(value.encode()).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:16], 'big') | 1
+        return [
+            (first + index * second) % self.bits_count
+            for index in range(self.hashes_count)
+        ]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self.positions(value)
+        )
+
+
+class RevocationList:
+    """
+    Отозванные токены в фильтре Блума процесса. Фильтр перестраивается
+    из таблицы RevokedToken раз в refresh секунд, поэтому отзыв в другом
+    процессе действует не позже, чем через это время. Срабатывание
+    фильтра подтверждается запросом к базе.
+    """
+
+    def __init__(self, capacity, error_rate, refresh):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh = refresh
+        self.lock = threading.Lock()
+        self.filter = None
+        self.built_at = 0
+        self.building = False
+        self.pending = []
+
+    def reset(self):
+        """Пустой фильтр, построенный сейчас."""
+        with self.lock:
+            self.filter = BloomFilter(self.capacity, self.error_rate)
+            self.built_at = time()
+            self.pending = []
+
+    def rebuild(self):
+        """
+        Строит фильтр из неистёкших отозванных токенов. Токены, отозванные
+        во время построения, добавляются в новый фильтр из pending.
+        """
+        with self.lock:
+            if self.building:
+                return
+            self.building = True
+            self.pending = []
+        try:
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            for jti in RevokedToken.objects.filter(
+                expires_at__gt=timezone.now()
+            ).values_list('jti', flat=True).iterator():
+                bloom.add(jti)
+            with self.lock:
+                for jti in self.pending:
+                    bloom.add(jti)
+                self.filter = bloom
+                self.built_at = time()
+        finally:
+            with self.lock:
+                self.building = False
+                self.pending = []
+
+    def add(self, jti):
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+            if self.building:
+                self.pending.append(jti)
+
+    def is_revoked(self, jti):
+        if time() - self.built_at > self.refresh:
+            self.rebuild()
+        bloom = self.filter
+        if bloom is not None and jti not in bloom:
+            return False
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        if bloom is not None and not revoked:
+            metrics.increment('yamdb_revocation_filter_false_positives_total')
+        return revoked
+
+
+revocation_list = RevocationList(
+    REVOCATION_FILTER_CAPACITY,
+    REVOCATION_FILTER_ERROR_RATE,
+    REVOCATION_FILTER_REFRESH
+)
+
+
+def get_session_id(token):
+    """jti refresh-токена, по которому выдан токен, или None."""
+    return token.get(SESSION_CLAIM)
+
+
+def is_revoked(token):
+    session_id = get_session_id(token)
+    return session_id is not None and revocation_list.is_revoked(session_id)
+
+
+def revoke(token):
+    """
+    Отзывает refresh-токен и выданные по нему access-токены. Заодно
+    удаляет записи об истёкших токенах: такие токены и так не примут.
+    """
+    with transaction.atomic():
+        RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        RevokedToken.objects.bulk_create([
+            RevokedToken(
+                jti=get_session_id(token),
+                expires_at=datetime_from_epoch(token['exp'])
+            )
+        ], ignore_conflicts=True)
+    revocation_list.add(get_session_id(token))
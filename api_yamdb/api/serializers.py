@@ -1,11 +1,11 @@
 from django.core.validators import RegexValidator
-from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 
 
 from api_yamdb.settings import (
+    CONFIRMATION_CODE_LENGTH,
     MAX_LENGTH_SLUG,
     MAX_LENGTH_EMAIL,
     MAX_LENGTH_USERNAME
@@ -81,6 +81,13 @@ class TitleReadSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class TitleExportSerializer(TitleReadSerializer):
+    """Сериализатор для выгрузки произведений с сохранённым рейтингом."""
+    rating = serializers.IntegerField(
+        read_only=True
+    )
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для записи произведения."""
     category = SlugRelatedField(
@@ -152,6 +159,26 @@ class CommentSerializer(serializers.ModelSerializer):
         exclude = ('review',)
 
 
+class UserCommentSerializer(CommentSerializer):
+    """Сериализатор для комментариев пользователя с отзывом и произведением."""
+    title = serializers.CharField(
+        source='review.title.name',
+        read_only=True
+    )
+
+    class Meta:
+        model = Comment
+        fields = (
+            'id',
+            'review',
+            'title',
+            'text',
+            'author',
+            'pub_date'
+        )
+        read_only_fields = ('review',)
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор для частичного обновления информации о пользователе."""
     email = serializers.EmailField(
@@ -222,18 +249,6 @@ class SignUpSerializer(serializers.ModelSerializer):
             'role'
         ]
 
-    def validate(self, data):
-        try:
-            MyUser.objects.get_or_create(
-                username=data.get('username'),
-                email=data.get('email')
-            )
-        except IntegrityError:
-            raise serializers.ValidationError(
-                'Пользователь с таким username/email уже существует'
-            )
-        return data
-
 
 class TokenSerializer(serializers.ModelSerializer):
     """Сериализатор для получения токена."""
@@ -246,8 +261,16 @@ class TokenSerializer(serializers.ModelSerializer):
                         message='Поле username имеет недопустимое значение'
                     )]
     )
-    confirmation_code = serializers.CharField(max_length=5, required=True)
+    confirmation_code = serializers.CharField(
+        max_length=CONFIRMATION_CODE_LENGTH,
+        required=True
+    )
 
     class Meta:
         model = MyUser
         fields = ('username', 'confirmation_code')
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """Сериализатор для обновления и отзыва токена."""
+    refresh = serializers.CharField(required=True)
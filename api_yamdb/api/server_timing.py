@@ -0,0 +1,129 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+PHASES = ('auth', 'perm', 'db', 'serialize', 'render')
+# Фазы, время SQL-запросов которых входит в саму фазу, а не в db:
+# аутентификация включает загрузку пользователя.
+PHASES_WITH_DB = ('auth', 'perm')
+
+current_timing = ContextVar('server_timing', default=None)
+
+
+class ServerTiming:
+    """
+    Время фаз обработки запроса для заголовка Server-Timing. Служит
+    и обёрткой выполнения SQL-запросов: их время попадает в фазу db,
+    если запрос выполнен не во время auth или perm.
+    """
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.phase = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if self.phase not in PHASES_WITH_DB:
+                self.durations['db'] += perf_counter() - start
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        Замеряет фазу без вложенных в неё SQL-запросов. Вложенные замеры
+        (например, вложенных сериализаторов) учитываются внешним.
+        """
+        if self.phase is not None:
+            yield
+            return
+        self.phase = phase
+        db = self.durations['db']
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase = None
+            self.durations[phase] += (
+                perf_counter() - start - self.durations['db'] + db
+            )
+
+    def header(self, total):
+        return ', '.join(
+            f'{phase};dur={duration * 1000:.3f}'
+            for phase, duration in (*self.durations.items(), ('total', total))
+        )
+
+
+def parse_header(header):
+    """Время фаз в миллисекундах из заголовка Server-Timing."""
+    durations = {}
+    for metric in header.split(','):
+        name, _, params = metric.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur':
+                durations[name] = float(value)
+    return durations
+
+
+def measure(phase):
+    """Замер фазы текущего запроса; вне запроса ничего не делает."""
+    timing = current_timing.get()
+    if timing is None:
+        return nullcontext()
+    return timing.measure(phase)
+
+
+# Методы DRF, время которых попадает в фазы: они оборачиваются один раз
+# для всех вью и сериализаторов, включая новые.
+TIMED_METHODS = (
+    ('rest_framework.views.APIView', 'perform_authentication', 'auth'),
+    ('rest_framework.views.APIView', 'check_permissions', 'perm'),
+    ('rest_framework.views.APIView', 'check_object_permissions', 'perm'),
+    ('rest_framework.serializers.Serializer', 'to_representation',
+     'serialize'),
+    ('rest_framework.serializers.ListSerializer', 'to_representation',
+     'serialize'),
+)
+
+
+def timed(phase, method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with measure(phase):
+            return method(*args, **kwargs)
+    wrapper.server_timing = phase
+    return wrapper
+
+
+def install():
+    """
+    Оборачивает замером методы TIMED_METHODS; повторный вызов безопасен.
+    Классы импортируются здесь: rest_framework.views при импорте читает
+    настройки рендереров, которые ссылаются на этот модуль.
+    """
+    for path, name, phase in TIMED_METHODS:
+        cls = import_string(path)
+        method = getattr(cls, name)
+        if not getattr(method, 'server_timing', None):
+            setattr(cls, name, timed(phase, method))
+
+
+class ServerTimingJSONRenderer(JSONRenderer):
+
+    def render(self, *args, **kwargs):
+        with measure('render'):
+            return super().render(*args, **kwargs)
+
+
+class ServerTimingBrowsableAPIRenderer(BrowsableAPIRenderer):
+
+    def render(self, *args, **kwargs):
+        with measure('render'):
+            return super().render(*args, **kwargs)
@@ -0,0 +1,70 @@
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from time import perf_counter
+
+from .call_site import get_call_site
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PLACEHOLDERS_PATTERN = re.compile(r'\((?:%s, )+%s\)')
+
+
+def normalize_sql(sql):
+    """Схлопывает пробелы и списки параметров IN (%s, %s, ...)."""
+    return PLACEHOLDERS_PATTERN.sub(
+        '(%s, ...)', WHITESPACE_PATTERN.sub(' ', sql).strip()
+    )
+
+
+def get_view(request):
+    """Класс вью и действие вьюсета, обрабатывающие запрос."""
+    match = request.resolver_match
+    if match is None:
+        return None, None
+    func = match.func
+    view_class = getattr(func, 'cls', getattr(func, 'view_class', None))
+    actions = getattr(func, 'actions', None) or {}
+    return (
+        view_class.__name__ if view_class else match.view_name,
+        actions.get(request.method.lower(), request.method.lower())
+    )
+
+
+class SlowQueryLogger:
+    """
+    Обёртка выполнения запросов: запросы дольше threshold секунд
+    пишутся в лог api.slow_queries json-строкой с нормализованным SQL,
+    вью, действием и местом вызова в коде.
+    """
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            if duration >= self.threshold:
+                self.log(sql, many, duration)
+
+    def log(self, sql, many, duration):
+        view, action = get_view(self.request)
+        library_site, project_site = get_call_site(skip=(__file__,))
+        logger.warning(json.dumps({
+            'time': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'sql': normalize_sql(sql),
+            'many': many,
+            'method': self.request.method,
+            'path': self.request.path,
+            'view': view,
+            'action': action,
+            'call_site': project_site or library_site,
+            'library_call_site': library_site,
+        }, ensure_ascii=False))
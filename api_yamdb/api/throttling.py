@@ -0,0 +1,224 @@
+import sqlite3
+import threading
+from time import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from api_yamdb.settings import (
+    THROTTLE_BACKEND,
+    THROTTLE_ENABLED,
+    THROTTLE_SQLITE_PATH
+)
+from . import metrics
+
+
+def get_wait(previous, current, elapsed, window, limit):
+    """Через сколько секунд оценка количества запросов станет меньше limit."""
+    if current < limit:
+        return window * (1 - (limit - current) / previous) - elapsed
+    # Текущее окно заполнено: ждём следующего, в котором текущие
+    # запросы станут предыдущими.
+    return window - elapsed + window * (1 - limit / current)
+
+
+def slide(state, now, window, limit):
+    """
+    Скользящее окно из двух фиксированных: запросы предыдущего окна
+    учитываются с весом, который убывает по мере прохождения текущего.
+    state - номер окна и количество запросов в предыдущем и текущем
+    окне или None. Возвращает новое состояние и время ожидания или None,
+    если запрос разрешён.
+    """
+    index = int(now // window)
+    if state is None:
+        previous = current = 0
+    else:
+        state_index, previous, current = state
+        if state_index != index:
+            previous = current if state_index == index - 1 else 0
+            current = 0
+    elapsed = now - index * window
+    if previous * (1 - elapsed / window) + current < limit:
+        return (index, previous, current + 1), None
+    return (index, previous, current), max(
+        0, get_wait(previous, current, elapsed, window, limit)
+    )
+
+
+class MemoryCounter:
+    """Счётчики скользящего окна в памяти процесса."""
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.states = {}
+        self.pruned_at = 0
+
+    def hit(self, key, limit, now):
+        with self.lock:
+            if now - self.pruned_at > self.window:
+                self.prune(now)
+            self.states[key], wait = slide(
+                self.states.get(key), now, self.window, limit
+            )
+        return wait
+
+    def prune(self, now):
+        """Удаляет счётчики, которые уже не влияют на оценку."""
+        index = int(now // self.window)
+        self.states = {
+            key: state for key, state in self.states.items()
+            if state[0] >= index - 1
+        }
+        self.pruned_at = now
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
+
+
+class SQLiteCounter:
+    """
+    Счётчики скользящего окна в файле SQLite, общие для нескольких
+    процессов сервера. У каждого потока своё соединение с файлом.
+    """
+
+    def __init__(self, path, window):
+        self.path = path
+        self.window = window
+        self.local = threading.local()
+        self.pruned_at = 0
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle ('
+                'key TEXT PRIMARY KEY, window INTEGER NOT NULL, '
+                'previous INTEGER NOT NULL, current INTEGER NOT NULL, '
+                'expires REAL NOT NULL)'
+            )
+            self.local.connection = connection
+        return connection
+
+    def hit(self, key, limit, now):
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state, wait = slide(
+                connection.execute(
+                    'SELECT window, previous, current FROM throttle '
+                    'WHERE key = ?', (key,)
+                ).fetchone(),
+                now, self.window, limit
+            )
+            connection.execute(
+                'INSERT INTO throttle VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET window = excluded.window, '
+                'previous = excluded.previous, current = excluded.current, '
+                'expires = excluded.expires',
+                (key, *state, (state[0] + 2) * self.window)
+            )
+            if now - self.pruned_at > self.window:
+                connection.execute(
+                    'DELETE FROM throttle WHERE expires < ?', (now,)
+                )
+                self.pruned_at = now
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM throttle')
+
+
+counters = {}
+counters_lock = threading.Lock()
+
+
+def get_counter(scope, window):
+    """Счётчик области scope в хранилище THROTTLE_BACKEND."""
+    key = (THROTTLE_BACKEND, scope)
+    with counters_lock:
+        counter = counters.get(key)
+        if counter is None:
+            if THROTTLE_BACKEND == 'sqlite':
+                counter = SQLiteCounter(THROTTLE_SQLITE_PATH, window)
+            else:
+                counter = MemoryCounter(window)
+            counters[key] = counter
+    return counter
+
+
+def reset():
+    """Сбрасывает все счётчики."""
+    with counters_lock:
+        for counter in counters.values():
+            counter.clear()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов по скользящему окну. Запросы считаются
+    по значению get_value отдельно для каждого вью; запросы без значения
+    не ограничиваются. Частота задаётся в DEFAULT_THROTTLE_RATES для scope.
+    """
+
+    def get_value(self, request):
+        raise NotImplementedError('.get_value() must be overridden')
+
+    def allow_request(self, request, view):
+        if not THROTTLE_ENABLED or self.rate is None:
+            return True
+        value = self.get_value(request)
+        if not value:
+            return True
+        self.wait_time = get_counter(self.scope, self.duration).hit(
+            f'{self.scope}:{type(view).__name__}:{value}',
+            self.num_requests,
+            time()
+        )
+        if self.wait_time is not None:
+            metrics.increment('yamdb_throttled_requests_total')
+        return self.wait_time is None
+
+    def wait(self):
+        return self.wait_time
+
+
+def get_field(request, name):
+    """Значение поля запроса для подсчёта без учёта регистра и пробелов."""
+    data = request.data
+    if not hasattr(data, 'get'):
+        return ''
+    return str(data.get(name, '')).strip().lower()
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    scope = 'auth_ip'
+
+    def get_value(self, request):
+        return self.get_ident(request)
+
+
+class AuthUsernameThrottle(SlidingWindowThrottle):
+    scope = 'auth_username'
+
+    def get_value(self, request):
+        return get_field(request, 'username')
+
+
+class AuthEmailThrottle(SlidingWindowThrottle):
+    scope = 'auth_email'
+
+    def get_value(self, request):
+        return get_field(request, 'email')
+
+
+AUTH_THROTTLES = (AuthIPThrottle, AuthUsernameThrottle, AuthEmailThrottle)
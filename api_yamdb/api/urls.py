@@ -5,10 +5,13 @@ from api.views import (
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
+    ReviewFeedViewSet,
     ReviewViewSet,
     SignUpAPIView,
     TitleViewSet,
     TokenApiView,
+    TokenRefreshApiView,
+    TokenRevokeApiView,
     UserViewSet,
 )
 
@@ -33,6 +36,11 @@ router_v1.register(
     ReviewViewSet,
     basename='review'
 )
+router_v1.register(
+    r'reviews',
+    ReviewFeedViewSet,
+    basename='review-feed'
+)
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentViewSet,
@@ -45,8 +53,14 @@ router_v1.register(
 )
 
 auth_urls = [
-    path('signup/', SignUpAPIView.as_view()),
-    path('token/', TokenApiView.as_view()),
+    path('signup/', SignUpAPIView.as_view(), name='signup'),
+    path('token/', TokenApiView.as_view(), name='token'),
+    path(
+        'token/refresh/', TokenRefreshApiView.as_view(), name='token-refresh'
+    ),
+    path(
+        'token/revoke/', TokenRevokeApiView.as_view(), name='token-revoke'
+    ),
 ]
 
 urlpatterns = [
@@ -1,39 +1,65 @@
-import random
+import hmac
+import json
 
-from django.core.mail import send_mail
+from django.core.cache import cache
 from django.db.models import Avg
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, mixins, status, views, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.encoders import JSONEncoder
 
-from api_yamdb.settings import AUTHENTICATION_EMAIL, URL_PATH_NAME
+from api_yamdb.settings import (
+    AUTHENTICATION_EMAIL,
+    EXPORT_CHUNK_SIZE,
+    LATEST_REVIEWS_CACHE_TIMEOUT,
+    METRICS_ALLOWED_IPS,
+    METRICS_TOKEN,
+    URL_PATH_NAME
+)
+from . import metrics
+from .authentication import (
+    RoleRefreshToken,
+    get_refresh_token,
+    refresh_access_token
+)
+from .confirmation import check_confirmation_code, make_confirmation_code
 from .filters import TitleViewSetFilter
+from .pagination import PubDateCursorPagination
 from .permissions import (
     IsAdminOrReadOnly,
     IsAdmin,
     IsAuthorOrModerOrAdmin
 )
+from reviews.exports import iter_reviews_csv, parse_since
 from reviews.models import (
     Category,
+    Comment,
+    EmailOutbox,
     Genre,
     MyUser,
     Review,
     Title
 )
+from .retry import retry_on_lock
+from .revocation import revoke
+from .throttling import AUTH_THROTTLES
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
+    RefreshTokenSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleExportSerializer,
     TitleReadSerializer,
     TitleWriteSerializer,
     TokenSerializer,
     UserAdminSerializer,
+    UserCommentSerializer,
     UserSerializer,
 )
 
@@ -81,8 +107,11 @@ class TitleViewSet(viewsets.ModelViewSet):
     POST-запрос - добавляет новое произведение.
     PATCH-запрос - частичное обновление произведения.
     DELETE-запрос - удаление произведения.
+    GET-запрос по export - выгрузка всех произведений в формате NDJSON.
     """
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').annotate(Avg('reviews__score'))
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleViewSetFilter
@@ -91,8 +120,40 @@ class TitleViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
+        if self.action == 'export':
+            return TitleExportSerializer
         return TitleWriteSerializer
 
+    @action(detail=False,
+            methods=['get'],
+            permission_classes=(IsAdmin,))
+    def export(self, request):
+        queryset = self.filter_queryset(Title.objects.all())
+        return StreamingHttpResponse(
+            self.export_lines(queryset),
+            content_type='application/x-ndjson'
+        )
+
+    def export_lines(self, queryset):
+        """
+        Построчно сериализует произведения пачками по EXPORT_CHUNK_SIZE.
+        Пачки выбираются по возрастанию id, поэтому в памяти держится
+        не больше одной пачки при любом размере каталога.
+        """
+        queryset = queryset.select_related(
+            'category'
+        ).prefetch_related('genre').order_by('pk')
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:EXPORT_CHUNK_SIZE])
+            if not chunk:
+                return
+            serializer = self.get_serializer(chunk, many=True)
+            for item in serializer.data:
+                yield json.dumps(item, cls=JSONEncoder, ensure_ascii=False)
+                yield '\n'
+            last_pk = chunk[-1].pk
+
 
 class ReviewViewSet(viewsets.ModelViewSet):
     """
@@ -109,13 +170,71 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return title.reviews.select_related('title', 'author')
+
+    @retry_on_lock
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
         serializer.save(author=self.request.user, title=title)
 
 
+class ReviewFeedViewSet(viewsets.GenericViewSet):
+    """
+    Вьюсет для ленты отзывов по всем произведениям.
+    GET-запрос по latest - получение последних отзывов.
+    GET-запрос по export - выгрузка всех отзывов в csv.
+    """
+    queryset = Review.objects.select_related('title', 'author')
+    serializer_class = ReviewSerializer
+    pagination_class = PubDateCursorPagination
+    permission_classes = (AllowAny,)
+
+    LATEST_CACHE_KEY = 'reviews-latest-first-page'
+
+    @action(detail=False, methods=['get'])
+    def latest(self, request):
+        first_page = (
+            self.paginator.cursor_query_param not in request.query_params
+        )
+        if first_page:
+            data = cache.get(self.LATEST_CACHE_KEY)
+            if data is not None:
+                return Response(data, status=status.HTTP_200_OK)
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        if first_page:
+            cache.set(
+                self.LATEST_CACHE_KEY,
+                response.data,
+                LATEST_REVIEWS_CACHE_TIMEOUT
+            )
+        return response
+
+    @action(detail=False,
+            methods=['get'],
+            permission_classes=(IsAdmin,))
+    def export(self, request):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_since(since)
+            except ValueError as error:
+                return Response(
+                    {'since': [str(error)]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        response = StreamingHttpResponse(
+            iter_reviews_csv(since=since),
+            content_type='text/csv'
+        )
+        response['Content-Disposition'] = 'attachment; filename="reviews.csv"'
+        return response
+
+
 class CommentViewSet(viewsets.ModelViewSet):
     """
     Вьюсет для комментариев.
@@ -135,7 +254,11 @@ class CommentViewSet(viewsets.ModelViewSet):
             pk=self.kwargs.get('review_id'),
             title_id=self.kwargs.get('title_id')
         )
-        return review.comments.all()
+        return review.comments.select_related('author')
+
+    @retry_on_lock
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         review = get_object_or_404(
@@ -149,34 +272,44 @@ class CommentViewSet(viewsets.ModelViewSet):
 class SignUpAPIView(views.APIView):
     """
     Вьюсет для получения кода подтверждения.
-    POST-запрос генерирует email с confirmation_code.
+    POST-запрос создаёт пользователя и ставит email с confirmation_code
+    в исходящую очередь, письмо отправляет команда send_outbox_emails.
     """
     permission_classes = (AllowAny,)
+    throttle_classes = AUTH_THROTTLES
     serializer_class = SignUpSerializer
     queryset = MyUser.objects.all()
 
+    @retry_on_lock
+    def register(self, username, email):
+        """
+        Создаёт пользователя и ставит письмо с кодом в очередь в одной
+        транзакции. Возвращает id пользователя или None, если username
+        или email заняты другим пользователем.
+        """
+        user_id = MyUser.objects.signup(username, email)
+        if user_id is not None:
+            EmailOutbox.objects.create(
+                subject='Код подтверждения',
+                body=f'Ваш код: {make_confirmation_code(user_id, email)}!',
+                from_email=AUTHENTICATION_EMAIL,
+                recipient=email,
+            )
+        return user_id
+
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             username = serializer.data['username']
             email = serializer.data['email']
-            MyUser.objects.get_or_create(
-                username=username,
-                email=email,
-            )
-            confirmation_code = ''.join(
-                [str(random.randint(0, 9)) for _ in range(5)]
-            )
-            MyUser.objects.filter(username=username, email=email,).update(
-                confirmation_code=confirmation_code
-            )
-            send_mail(
-                subject='Код подтверждения',
-                message=f'Ваш код: {confirmation_code}!',
-                from_email=AUTHENTICATION_EMAIL,
-                recipient_list=[serializer.data['email']],
-                fail_silently=False,
-            )
+            user_id = self.register(username, email)
+            if user_id is None:
+                return Response(
+                    {'non_field_errors': [
+                        'Пользователь с таким username/email уже существует'
+                    ]},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             return Response(
                 {'email': email, 'username': username},
                 status=status.HTTP_200_OK
@@ -187,28 +320,70 @@ class SignUpAPIView(views.APIView):
 class TokenApiView(views.APIView):
     """
     Вьюсет для получения токена.
-    POST-запрос генерирует jwt-token.
+    POST-запрос проверяет confirmation_code и генерирует jwt-token
+    и refresh-токен для его обновления.
     """
+    throttle_classes = AUTH_THROTTLES
     serializer_class = TokenSerializer
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             user = get_object_or_404(
-                MyUser,
+                MyUser.objects.only(
+                    'id', 'email', 'username', 'role', 'is_staff',
+                    'is_superuser', 'is_active'
+                ),
                 username=serializer.data['username']
             )
-            if serializer.data['confirmation_code'] == user.confirmation_code:
-                refresh = RefreshToken.for_user(user)
+            if check_confirmation_code(
+                user.id, user.email, serializer.data['confirmation_code']
+            ):
+                refresh = RoleRefreshToken.for_user(user)
                 return Response(
-                    {'token': str(refresh.access_token)},
+                    {
+                        'token': str(refresh.access_token),
+                        'refresh': str(refresh)
+                    },
                     status=status.HTTP_200_OK
                 )
-            Response('Проверьте правильность введенных данных!',
-                     status=status.HTTP_400_BAD_REQUEST)
+            return Response('Проверьте правильность введенных данных!',
+                            status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TokenRefreshApiView(views.APIView):
+    """
+    Вьюсет для обновления токена.
+    POST-запрос проверяет refresh-токен и генерирует новый jwt-token
+    с текущей ролью пользователя.
+    """
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = get_refresh_token(serializer.validated_data['refresh'])
+        return Response(
+            {'token': str(refresh_access_token(refresh))},
+            status=status.HTTP_200_OK
+        )
+
+
+class TokenRevokeApiView(views.APIView):
+    """
+    Вьюсет для отзыва токена.
+    POST-запрос отзывает refresh-токен и все jwt-token, выданные по нему.
+    """
+    serializer_class = RefreshTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoke(get_refresh_token(serializer.validated_data['refresh']))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     Вьюсет для users для администраторов.
@@ -219,6 +394,8 @@ class UserViewSet(viewsets.ModelViewSet):
     DELETE-запрос по username - удаление конкретного пользователя.
     GET-запрос по me - получение данных своей учетки.
     PATCH-запрос по me - изменение данных своей учетки.
+    GET-запрос по me/reviews - получение своих отзывов.
+    GET-запрос по me/comments - получение своих комментариев.
     """
     queryset = MyUser.objects.all()
     serializer_class = UserAdminSerializer
@@ -235,12 +412,18 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes=(IsAuthenticated,),
             serializer_class=UserSerializer)
     def users_me(self, request):
+        user = request.user
+        if user.get_deferred_fields():
+            # Пользователь из утверждений токена хранит роль из токена,
+            # а сохранение пишет все поля: профиль загружается из базы
+            # целиком, чтобы не вернуть в базу устаревшую роль.
+            user = MyUser.objects.get(pk=user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user, many=False)
+            serializer = self.get_serializer(user, many=False)
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             serializer = self.get_serializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
@@ -251,3 +434,49 @@ class UserViewSet(viewsets.ModelViewSet):
                 serializer.errors,
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+    @action(detail=False,
+            methods=['get'],
+            url_path=f'{URL_PATH_NAME}/reviews',
+            url_name=f'{URL_PATH_NAME}-reviews',
+            permission_classes=(IsAuthenticated,),
+            serializer_class=ReviewSerializer,
+            pagination_class=PubDateCursorPagination)
+    def users_me_reviews(self, request):
+        queryset = Review.objects.filter(
+            author=request.user
+        ).select_related('title', 'author')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False,
+            methods=['get'],
+            url_path=f'{URL_PATH_NAME}/comments',
+            url_name=f'{URL_PATH_NAME}-comments',
+            permission_classes=(IsAuthenticated,),
+            serializer_class=UserCommentSerializer,
+            pagination_class=PubDateCursorPagination)
+    def users_me_comments(self, request):
+        queryset = Comment.objects.filter(
+            author=request.user
+        ).select_related('review__title', 'author')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+def metrics_view(request):
+    """
+    Метрики запросов в текстовом формате Prometheus.
+    Доступны только с адресов из METRICS_ALLOWED_IPS и, если задан
+    METRICS_TOKEN, только с этим токеном в заголовке Authorization.
+    """
+    if request.META.get('REMOTE_ADDR') not in METRICS_ALLOWED_IPS:
+        raise Http404
+    if METRICS_TOKEN is not None and not hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {METRICS_TOKEN}'
+    ):
+        raise Http404
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
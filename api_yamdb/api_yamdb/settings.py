@@ -30,6 +30,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.SlowQueryLogMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +40,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -70,6 +74,28 @@ DATABASES = {
     }
 }
 
+# PRAGMA, которые выполняются на каждом новом соединении с SQLite
+# (reviews/signals.py). WAL позволяет читать во время записи, а
+# busy_timeout - ждать освобождения базы вместо ошибки
+# `database is locked`. Пустой словарь оставляет настройки SQLite.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Повтор транзакций записи, которые не дождались блокировки SQLite
+# (`database is locked`): количество попыток и границы паузы в секундах
+# между ними. Пауза случайна в пределах удваивающейся границы.
+LOCK_RETRY_ATTEMPTS = 5
+
+LOCK_RETRY_BASE_DELAY = 0.02
+
+LOCK_RETRY_MAX_DELAY = 0.5
+
 
 # Password validation
 
@@ -117,30 +143,79 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 AUTHENTICATION_EMAIL = 'yambdauth@api_example.com'
 
+CONFIRMATION_CODE_LENGTH = 6
+
+# Длина окна времени кода подтверждения в секундах: код действует
+# до конца своего окна и всё следующее окно.
+CONFIRMATION_CODE_WINDOW = 15 * 60
+
+EMAIL_OUTBOX_BATCH_SIZE = 50
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_POLL_INTERVAL = 1
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleClaimsJWTAuthentication',
+    ),
+
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.server_timing.ServerTimingJSONRenderer',
+        'api.server_timing.ServerTimingBrowsableAPIRenderer',
     ),
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+
+    # Количество доверенных прокси перед сервером. При 0 IP-адрес
+    # клиента берётся из REMOTE_ADDR, а X-Forwarded-For, который клиент
+    # может подделать, не учитывается.
+    'NUM_PROXIES': 0,
+
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '5/min',
+        'auth_email': '5/min',
+    },
 }
 
+# Сколько секунд после выдачи токена роль из него используется без
+# загрузки пользователя из базы. Токен живёт столько же, поэтому весь
+# срок его действия пользователь не загружается, а роль и активность
+# перепроверяются при обновлении токена.
+ROLE_CLAIMS_MAX_AGE = 15 * 60
+
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
+    'ACCESS_TOKEN_LIFETIME': timedelta(seconds=ROLE_CLAIMS_MAX_AGE),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш проверенных JWT: количество токенов и время жизни записи в секундах.
+JWT_CACHE_SIZE = 10000
+
+JWT_CACHE_TTL = 5 * 60
+
+# Фильтр Блума отозванных токенов: на сколько токенов он рассчитан, доля
+# ложных срабатываний и через сколько секунд он перестраивается из базы.
+REVOCATION_FILTER_CAPACITY = 100000
+
+REVOCATION_FILTER_ERROR_RATE = 0.001
+
+REVOCATION_FILTER_REFRESH = 60
+
 MAX_LENGTH_NAME = 256
 
 MAX_LENGTH_SLUG = 50
 
 MAX_LENGTH_EMAIL = 254
 
+MAX_LENGTH_JTI = 64
+
 MAX_LENGTH_BIO = 1024
 
 MAX_LENGTH_USERNAME = 150
@@ -148,3 +223,76 @@ MAX_LENGTH_USERNAME = 150
 MAX_LENGTH_COMMENT = 10
 
 URL_PATH_NAME = 'me'
+
+LATEST_REVIEWS_CACHE_TIMEOUT = 5
+
+EXPORT_CHUNK_SIZE = 1000
+
+LOAD_CSV_BATCH_SIZE = 5000
+
+LOAD_CSV_MANIFEST = BASE_DIR / '.load_csv_manifest.json'
+
+LOAD_CSV_REJECTS_DIR = BASE_DIR / 'rejects'
+
+GENERATED_DATA_DIR = BASE_DIR / 'generated_data'
+
+BENCHMARK_REPORT = BASE_DIR / 'benchmark.json'
+
+# /metrics доступен с адресов METRICS_ALLOWED_IPS. За прокси-сервером
+# все запросы приходят с его адреса, поэтому задайте METRICS_TOKEN:
+# тогда нужен заголовок Authorization: Bearer <METRICS_TOKEN>.
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+METRICS_TOKEN = None
+
+# Порог в секундах для журнала медленных SQL-запросов, None - выключен.
+SLOW_QUERY_LOG_THRESHOLD = None
+
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.jsonl'
+
+# Заголовок Server-Timing со временем фаз обработки запроса.
+SERVER_TIMING_ENABLED = True
+
+# Профилирование запросов администратора по заголовку X-Profile.
+PROFILING_ENABLED = False
+
+PROFILING_DIR = BASE_DIR / 'profiles'
+
+PROFILING_SAMPLE_INTERVAL = 0.001
+
+# Ограничение частоты запросов к /auth/signup/ и /auth/token/.
+# memory - счётчики в памяти процесса, sqlite - общие для всех процессов
+# сервера счётчики в файле THROTTLE_SQLITE_PATH.
+THROTTLE_ENABLED = True
+
+THROTTLE_BACKEND = 'memory'
+
+THROTTLE_SQLITE_PATH = BASE_DIR / 'throttle.sqlite3'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_lines': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+            'formatter': 'json_lines',
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
@@ -4,9 +4,11 @@ from django.contrib.auth.admin import UserAdmin
 from reviews.models import (
     Category,
     Comment,
+    EmailOutbox,
     Genre,
     MyUser,
     Review,
+    RevokedToken,
     Title,
 )
 
@@ -16,6 +18,17 @@ class CommonAdmin(admin.ModelAdmin):
     pass
 
 
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'sent_at', 'attempts')
+    list_filter = ('sent_at',)
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'created', 'expires_at')
+
+
 class MyUserAdmin(UserAdmin):
     model = MyUser
 
@@ -0,0 +1,71 @@
+from django.db import connection
+
+
+def get_db_values(obj, fields):
+    """
+    Готовит значения полей объекта для записи в базу.
+    В отличие от bulk_create, заданные значения не перезаписываются
+    через pre_save: например, pub_date из csv-файла сохраняется как есть.
+    """
+    values = []
+    for field in fields:
+        value = getattr(obj, field.attname)
+        if value is None:
+            value = field.pre_save(obj, add=True)
+        values.append(field.get_db_prep_save(value, connection))
+    return values
+
+
+def bulk_insert(model, objs, update_fields=None):
+    """
+    Записывает объекты в таблицу модели запросами INSERT по пачкам.
+    Если передан update_fields, выполняется upsert: для существующих
+    первичных ключей INSERT ... ON CONFLICT DO UPDATE обновляет только
+    перечисленные поля и только в тех строках, где они изменились.
+    Возвращает количество вставленных и обновлённых строк.
+    """
+    if not objs:
+        return 0
+    opts = model._meta
+    quote_name = connection.ops.quote_name
+    table = quote_name(opts.db_table)
+    fields = opts.concrete_fields
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    row_sql = '({})'.format(', '.join(['%s'] * len(fields)))
+    conflict_sql = ''
+    if update_fields is not None:
+        conflict_sql = f' ON CONFLICT ({quote_name(opts.pk.column)})'
+        update_columns = [
+            quote_name(opts.get_field(name).column) for name in update_fields
+        ]
+        if update_columns:
+            distinct = (
+                'IS NOT' if connection.vendor == 'sqlite'
+                else 'IS DISTINCT FROM'
+            )
+            assignments = ', '.join(
+                f'{column} = excluded.{column}' for column in update_columns
+            )
+            changed = ' OR '.join(
+                f'{table}.{column} {distinct} excluded.{column}'
+                for column in update_columns
+            )
+            conflict_sql += f' DO UPDATE SET {assignments} WHERE {changed}'
+        else:
+            conflict_sql += ' DO NOTHING'
+    batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    affected = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            values_sql = ', '.join([row_sql] * len(batch))
+            params = [
+                value for obj in batch for value in get_db_values(obj, fields)
+            ]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {values_sql}'
+                f'{conflict_sql}',
+                params
+            )
+            affected += cursor.rowcount
+    return affected
@@ -0,0 +1,58 @@
+import csv
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from api_yamdb.settings import EXPORT_CHUNK_SIZE
+from .models import Review
+
+REVIEW_EXPORT_FIELDS = ('id', 'title_id', 'author', 'score', 'pub_date')
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def parse_since(value):
+    """
+    Разбор параметра since: дата или дата со временем в формате ISO 8601.
+    Время без часового пояса считается временем в TIME_ZONE проекта.
+    """
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                raise ValueError
+            since = datetime.combine(date, time.min)
+    except ValueError:
+        raise ValueError(
+            'Параметр since должен быть датой или датой со временем '
+            'в формате ISO 8601.'
+        )
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def iter_reviews_csv(since=None):
+    """
+    Построчно формирует csv-выгрузку отзывов.
+    Строки читаются из базы итератором пачками по EXPORT_CHUNK_SIZE
+    в порядке публикации, поэтому память не растёт с числом отзывов.
+    Если передан since, выгружаются только отзывы, опубликованные позже.
+    """
+    queryset = Review.objects.order_by('pub_date', 'pk')
+    if since is not None:
+        queryset = queryset.filter(pub_date__gt=since)
+    writer = csv.writer(Echo())
+    yield writer.writerow(REVIEW_EXPORT_FIELDS)
+    rows = queryset.values_list(
+        'id', 'title_id', 'author__username', 'score', 'pub_date'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for *fields, pub_date in rows:
+        yield writer.writerow((*fields, pub_date.isoformat()))
@@ -0,0 +1,167 @@
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from api_yamdb.settings import SQLITE_PRAGMAS
+from reviews.signals import apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE review ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, title_id INTEGER NOT NULL, '
+    'author_id INTEGER NOT NULL, text TEXT NOT NULL, '
+    'score INTEGER NOT NULL, pub_date TEXT NOT NULL)',
+    'CREATE INDEX review_title_id ON review (title_id)',
+)
+INSERT_REVIEW = (
+    'INSERT INTO review (title_id, author_id, text, score, pub_date) '
+    "VALUES (?, ?, ?, ?, datetime('now'))"
+)
+SELECT_RATING = (
+    'SELECT AVG(score), COUNT(*) FROM review WHERE title_id = ?'
+)
+
+
+class Command(BaseCommand):
+    """Management-команда для сравнения настроек SQLite под нагрузкой."""
+
+    help = (
+        'Используйте эту Management-команду, чтобы сравнить пропускную '
+        'способность SQLite с настройками по умолчанию и с PRAGMA из '
+        'SQLITE_PRAGMAS: несколько потоков пишут отзывы, другие потоки '
+        'одновременно считают рейтинг произведений во временной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=4,
+            help='Количество потоков, добавляющих отзывы.'
+        )
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=8,
+            help='Количество потоков, читающих рейтинг.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность замера каждого профиля в секундах.'
+        )
+        parser.add_argument(
+            '--titles',
+            type=int,
+            default=1000,
+            help='Количество произведений в тестовых данных.'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100000,
+            help='Количество отзывов в базе перед замером.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к json-отчёту.'
+        )
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        report = {}
+        for name, pragmas in (('default', {}), ('tuned', SQLITE_PRAGMAS)):
+            with tempfile.TemporaryDirectory() as directory:
+                report[name] = self.run_profile(
+                    Path(directory) / 'benchmark.sqlite3', pragmas
+                )
+            self.stdout.write(
+                f'{name}: запись {report[name]["writes_per_second"]:.0f}/с, '
+                f'чтение {report[name]["reads_per_second"]:.0f}/с, '
+                f'ошибок `database is locked`: {report[name]["locked"]}'
+            )
+        if kwargs['output']:
+            with open(kwargs['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=4)
+            self.stdout.write(self.style.SUCCESS(
+                f'Отчёт сохранён в файл: {kwargs["output"]}')
+            )
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, timeout=5)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def seed(self, path, pragmas):
+        connection = self.connect(path, pragmas)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany(INSERT_REVIEW, (
+                (
+                    index % self.options['titles'], index,
+                    'Текст отзыва', index % 10 + 1
+                )
+                for index in range(self.options['rows'])
+            ))
+        connection.close()
+
+    def run_profile(self, path, pragmas):
+        """Замер одного профиля PRAGMA на новой базе."""
+        self.seed(path, pragmas)
+        counts = {'writes': 0, 'reads': 0, 'locked': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def work(write):
+            connection = self.connect(path, pragmas)
+            randomizer = random.Random()
+            done = locked = 0
+            while not stop.is_set():
+                title_id = randomizer.randrange(self.options['titles'])
+                try:
+                    if write:
+                        with connection:
+                            connection.execute(INSERT_REVIEW, (
+                                title_id, randomizer.randrange(10 ** 6),
+                                'Текст отзыва', randomizer.randint(1, 10)
+                            ))
+                    else:
+                        connection.execute(SELECT_RATING, (title_id,))
+                    done += 1
+                except sqlite3.OperationalError as error:
+                    if 'database is locked' not in str(error):
+                        raise
+                    locked += 1
+            connection.close()
+            with lock:
+                counts['writes' if write else 'reads'] += done
+                counts['locked'] += locked
+
+        threads = [
+            threading.Thread(target=work, args=(write,))
+            for write in (
+                [True] * self.options['writers']
+                + [False] * self.options['readers']
+            )
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        time.sleep(self.options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        return {
+            'pragmas': pragmas,
+            'writes_per_second': counts['writes'] / elapsed,
+            'reads_per_second': counts['reads'] / elapsed,
+            'locked': counts['locked'],
+        }
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.exports import iter_reviews_csv, parse_since
+
+
+class Command(BaseCommand):
+    """Management-команда для выгрузки отзывов в csv."""
+
+    help = (
+        'Используйте эту Management-команду для выгрузки всех отзывов '
+        'в csv: id, title_id, author, score, pub_date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только отзывы, опубликованные после этой даты.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Путь к csv-файлу. По умолчанию выгрузка идёт в stdout.'
+        )
+
+    def handle(self, *args, **kwargs):
+        since = None
+        if kwargs['since']:
+            try:
+                since = parse_since(kwargs['since'])
+            except ValueError as error:
+                raise CommandError(error)
+        lines = iter_reviews_csv(since=since)
+        if kwargs['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(kwargs['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отзывы выгружены в файл: {kwargs["output"]}')
+        )
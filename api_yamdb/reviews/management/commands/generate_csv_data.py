@@ -0,0 +1,276 @@
+import csv
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb.settings import GENERATED_DATA_DIR
+
+CATEGORIES = (
+    ('Фильм', 'movie'),
+    ('Книга', 'book'),
+    ('Музыка', 'music'),
+)
+GENRES = (
+    ('Драма', 'drama'),
+    ('Комедия', 'comedy'),
+    ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'),
+    ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'),
+    ('Триллер', 'thriller'),
+    ('Сказка', 'tale'),
+    ('Гонзо', 'gonzo'),
+    ('Ужасы', 'horror'),
+    ('Боевик', 'action'),
+    ('Мелодрама', 'romance'),
+    ('Классика', 'classical'),
+    ('Рок', 'rock'),
+    ('Шансон', 'chanson'),
+)
+REVIEW_TEXTS = (
+    'Ставлю десять звёзд!',
+    'Смотрел(а) на одном дыхании.',
+    'Неплохо, но можно было лучше.',
+    'Не понравилось, зря потратил(а) время.',
+    'Шедевр, пересматриваю каждый год.',
+    'Середнячок, на один раз.',
+)
+COMMENT_TEXTS = (
+    'Полностью согласен!',
+    'Ничего подобного, всё было не так.',
+    'Спасибо за отзыв.',
+    'А мне понравилось.',
+)
+SCORES = range(1, 11)
+MIN_YEAR = 1900
+PUB_DATE_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+PUB_DATE_SPAN = timedelta(days=365 * 10).total_seconds()
+DRAW_CHUNK_SIZE = 1_000_000
+
+
+def parse_count(value):
+    """Разбор количества строк: 1000, 100k, 10M."""
+    multipliers = {'k': 10 ** 3, 'm': 10 ** 6}
+    try:
+        suffix = value[-1:].lower()
+        if suffix in multipliers:
+            return int(float(value[:-1]) * multipliers[suffix])
+        return int(value)
+    except ValueError:
+        raise CommandError(f'Некорректное количество: {value}')
+
+
+class Command(BaseCommand):
+    """Management-команда для генерации тестовых csv файлов."""
+
+    help = (
+        'Используйте эту Management-команду для генерации csv файлов '
+        'заданного размера в формате команды load_csv_com.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews',
+            type=parse_count,
+            default=1000,
+            help='Количество отзывов: например, 1k, 100k или 10M.'
+        )
+        parser.add_argument(
+            '--titles',
+            type=parse_count,
+            help='Количество произведений. По умолчанию отзывов / 20.'
+        )
+        parser.add_argument(
+            '--users',
+            type=parse_count,
+            help='Количество пользователей. По умолчанию отзывов / 10.'
+        )
+        parser.add_argument(
+            '--comments',
+            type=float,
+            default=0.5,
+            help='Среднее количество комментариев на один отзыв.'
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.0,
+            help='Показатель закона Ципфа для популярности произведений.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Начальное значение генератора для воспроизводимости.'
+        )
+        parser.add_argument(
+            '--output',
+            default=GENERATED_DATA_DIR,
+            help='Директория для csv файлов.'
+        )
+
+    def handle(self, *args, **kwargs):
+        self.random = random.Random(kwargs['seed'])
+        reviews = kwargs['reviews']
+        titles = kwargs['titles'] or max(reviews // 20, 10)
+        users = kwargs['users'] or max(reviews // 10, 100)
+        if reviews > titles * users:
+            raise CommandError(
+                'Каждый пользователь может оставить только один отзыв на '
+                'произведение: увеличьте --titles или --users.'
+            )
+        os.makedirs(kwargs['output'], exist_ok=True)
+        self.output = kwargs['output']
+        start = time.monotonic()
+        self.write_csv(
+            'category.csv', ('id', 'name', 'slug'),
+            ((pk, *row) for pk, row in enumerate(CATEGORIES, 1))
+        )
+        self.write_csv(
+            'genre.csv', ('id', 'name', 'slug'),
+            ((pk, *row) for pk, row in enumerate(GENRES, 1))
+        )
+        self.write_csv(
+            'users.csv',
+            ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+            self.generate_users(users)
+        )
+        self.write_csv(
+            'titles.csv', ('id', 'name', 'year', 'category'),
+            self.generate_titles(titles)
+        )
+        self.write_csv(
+            'genre_title.csv', ('id', 'title_id', 'genre_id'),
+            self.generate_genre_titles(titles)
+        )
+        counts = self.distribute_reviews(
+            reviews, titles, users, kwargs['zipf']
+        )
+        self.write_csv(
+            'review.csv',
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            self.generate_reviews(counts, users)
+        )
+        self.write_csv(
+            'comments.csv',
+            ('id', 'review_id', 'text', 'author', 'pub_date'),
+            self.generate_comments(
+                round(reviews * kwargs['comments']), reviews, users
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано отзывов: {reviews}, произведений: {titles}, '
+            f'пользователей: {users} за {time.monotonic() - start:.2f} с '
+            f'в директории {self.output}')
+        )
+
+    def write_csv(self, file_name, header, rows):
+        with open(os.path.join(self.output, file_name), 'w',
+                  encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def generate_pub_dates(self, count):
+        """Случайные даты публикации за последние десять лет."""
+        return (
+            (PUB_DATE_START + timedelta(seconds=offset)).isoformat(
+                timespec='milliseconds'
+            ).replace('+00:00', 'Z')
+            for offset in (
+                self.random.random() * PUB_DATE_SPAN for _ in range(count)
+            )
+        )
+
+    def generate_users(self, users):
+        roles = self.random.choices(
+            ('user', 'moderator', 'admin'), weights=(97, 2, 1), k=users
+        )
+        for pk, role in enumerate(roles, 1):
+            yield pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+
+    def generate_titles(self, titles):
+        current_year = datetime.now().year
+        for pk in range(1, titles + 1):
+            yield (
+                pk,
+                f'Произведение {pk}',
+                self.random.randint(MIN_YEAR, current_year),
+                self.random.randint(1, len(CATEGORIES)),
+            )
+
+    def generate_genre_titles(self, titles):
+        pk = 0
+        for title_id in range(1, titles + 1):
+            genres = self.random.sample(
+                range(1, len(GENRES) + 1), self.random.randint(1, 3)
+            )
+            for genre_id in genres:
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def distribute_reviews(self, reviews, titles, users, zipf):
+        """
+        Распределяет отзывы по произведениям по закону Ципфа: произведение
+        ранга r получает долю отзывов, пропорциональную 1 / r ** zipf.
+        Произведение не может получить больше отзывов, чем пользователей:
+        излишек перераспределяется между остальными произведениями.
+        """
+        weights = [1 / rank ** zipf for rank in range(1, titles + 1)]
+        counts = [0] * titles
+        remaining = reviews
+        while remaining:
+            cum_weights = list(accumulate(weights))
+            draw = min(remaining, DRAW_CHUNK_SIZE)
+            for index in self.random.choices(
+                range(titles), cum_weights=cum_weights, k=draw
+            ):
+                if counts[index] < users:
+                    counts[index] += 1
+                    remaining -= 1
+                else:
+                    weights[index] = 0
+        return counts
+
+    def generate_reviews(self, counts, users):
+        """
+        Отзывы по произведениям. У каждого произведения своя средняя
+        оценка, вокруг которой нормально распределены оценки отзывов.
+        """
+        pk = 0
+        for title_id, count in enumerate(counts, 1):
+            if not count:
+                continue
+            mean = self.random.uniform(2, 9.5)
+            spread = self.random.uniform(0.8, 2.5)
+            score_weights = [
+                math.exp(-((score - mean) / spread) ** 2 / 2)
+                for score in SCORES
+            ]
+            authors = self.random.sample(range(1, users + 1), count)
+            scores = self.random.choices(
+                SCORES, weights=score_weights, k=count
+            )
+            texts = self.random.choices(REVIEW_TEXTS, k=count)
+            pub_dates = self.generate_pub_dates(count)
+            for author, score, text, pub_date in zip(
+                authors, scores, texts, pub_dates
+            ):
+                pk += 1
+                yield pk, title_id, text, author, score, pub_date
+
+    def generate_comments(self, comments, reviews, users):
+        pub_dates = self.generate_pub_dates(comments)
+        for pk, pub_date in enumerate(pub_dates, 1):
+            yield (
+                pk,
+                self.random.randint(1, reviews),
+                self.random.choice(COMMENT_TEXTS),
+                self.random.randint(1, users),
+                pub_date,
+            )
@@ -0,0 +1,168 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from api_yamdb.settings import (
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_POLL_INTERVAL
+)
+from reviews.models import EmailOutbox
+
+
+class Command(BaseCommand):
+    """Management-команда для отправки писем из исходящей очереди."""
+
+    help = (
+        'Используйте эту Management-команду, чтобы отправлять письма из '
+        'исходящей очереди EmailOutbox. Письма отправляются пачками из '
+        'нескольких потоков, каждый поток держит одно открытое соединение '
+        'с почтовым сервером. Запускайте один экземпляр команды.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Количество потоков отправки.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, которые поток берёт из очереди за раз.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='После стольких неудачных попыток письмо не отправляется.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах между проверками пустой очереди.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить накопившиеся письма и завершиться.'
+        )
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        with ThreadPoolExecutor(kwargs['threads']) as executor:
+            try:
+                while True:
+                    sent, failed = self.drain(executor)
+                    if sent or failed:
+                        self.stdout.write(
+                            f'Отправлено писем: {sent}, ошибок: {failed}'
+                        )
+                    if kwargs['once']:
+                        break
+                    if not sent and not failed:
+                        time.sleep(kwargs['interval'])
+            except KeyboardInterrupt:
+                pass
+            finally:
+                for connection in self.connections:
+                    connection.close()
+
+    def drain(self, executor):
+        """
+        Отправляет письма очереди до её конца. Письма, которые не удалось
+        отправить, повторяются при следующем проходе.
+        """
+        batch_size = self.options['batch_size']
+        chunk_size = batch_size * self.options['threads']
+        sent = failed = last_id = 0
+        while True:
+            emails = list(EmailOutbox.objects.pending(
+                self.options['max_attempts']
+            ).filter(pk__gt=last_id)[:chunk_size])
+            if not emails:
+                break
+            last_id = emails[-1].pk
+            batches = [
+                emails[index:index + batch_size]
+                for index in range(0, len(emails), batch_size)
+            ]
+            for batch, (batch_sent, error) in zip(
+                batches, executor.map(self.send_batch, batches)
+            ):
+                self.mark(batch, batch_sent, error)
+                sent += batch_sent
+                failed += len(batch) - batch_sent
+        return sent, failed
+
+    def get_connection(self):
+        """Соединение с почтовым сервером, своё у каждого потока."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+
+    def drop_connection(self):
+        """Закрывает соединение потока после ошибки отправки."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            return
+        del self.local.connection
+        with self.lock:
+            self.connections.remove(connection)
+        connection.close()
+
+    def send_batch(self, batch):
+        """
+        Отправляет письма пачки по одному через открытое соединение и
+        останавливается на первой ошибке. Возвращает количество
+        отправленных писем и текст ошибки или None: так при повторе
+        не отправляются письма, уже доставленные до ошибки.
+        """
+        try:
+            connection = self.get_connection()
+        except Exception as error:
+            self.drop_connection()
+            return 0, f'{type(error).__name__}: {error}'
+        for sent, email in enumerate(batch):
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=[email.recipient]
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                self.drop_connection()
+                return sent, f'{type(error).__name__}: {error}'
+        return len(batch), None
+
+    def mark(self, batch, sent, error):
+        """
+        Первые sent писем пачки отмечает отправленными, остальные -
+        неудачной попыткой с текстом ошибки.
+        """
+        if sent:
+            EmailOutbox.objects.filter(
+                pk__in=[email.pk for email in batch[:sent]]
+            ).update(sent_at=timezone.now(), attempts=F('attempts') + 1)
+        if error is not None:
+            EmailOutbox.objects.filter(
+                pk__in=[email.pk for email in batch[sent:]]
+            ).update(attempts=F('attempts') + 1, last_error=error)
@@ -1,15 +1,18 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models.functions import Cast
 
 from api_yamdb.settings import (
     MAX_LENGTH_BIO,
     MAX_LENGTH_COMMENT,
     MAX_LENGTH_EMAIL,
+    MAX_LENGTH_JTI,
     MAX_LENGTH_NAME,
     MAX_LENGTH_SLUG,
     MAX_LENGTH_USERNAME
 )
+from .bulk import get_db_values
 from .validators import validate_username_me, validate_year
 
 
@@ -49,6 +52,21 @@ class Genre(BaseModel):
         verbose_name_plural = 'Жанры'
 
 
+class TitleQuerySet(models.QuerySet):
+    """Набор запросов для произведений."""
+
+    def update_rating(self):
+        """Пересчитывает сохранённый рейтинг по оценкам отзывов."""
+        rating = Review.objects.filter(
+            title=models.OuterRef('pk')
+        ).order_by().values('title').annotate(
+            rating=models.Avg('score')
+        ).values('rating')
+        return self.update(
+            rating=Cast(models.Subquery(rating), models.IntegerField())
+        )
+
+
 class Title(models.Model):
     """Модель произведения."""
     name = models.CharField(
@@ -85,6 +103,8 @@ class Title(models.Model):
         null=True
     )
 
+    objects = TitleQuerySet.as_manager()
+
     class Meta:
         ordering = ('year', 'name',)
         verbose_name = 'Произведение'
@@ -111,6 +131,74 @@ class GenreTitle(models.Model):
         return f'Произведение: {self.title}, Жанр: {self.genre}.'
 
 
+# RETURNING и несколько ON CONFLICT в одном INSERT появились в SQLite 3.35.
+SQLITE_UPSERT_VERSION = (3, 35, 0)
+
+
+def supports_upsert_returning():
+    """Регистрация одним запросом написана только для SQLite 3.35+."""
+    return (
+        connection.vendor == 'sqlite'
+        and connection.Database.sqlite_version_info >= SQLITE_UPSERT_VERSION
+    )
+
+
+class MyUserManager(UserManager):
+    """Менеджер пользователей с регистрацией одним запросом."""
+
+    def signup(self, username, email):
+        """
+        Создаёт пользователя, если его нет, одним запросом
+        INSERT ... ON CONFLICT. Возвращает id нового или существующего
+        пользователя с этими username и email или None, если username или
+        email заняты другим пользователем. На SQLite старше 3.35 и других
+        базах регистрация выполняется через ORM несколькими запросами.
+        """
+        if not supports_upsert_returning():
+            return self.signup_orm(username, email)
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+        table = quote_name(opts.db_table)
+        fields = [
+            field for field in opts.concrete_fields if not field.primary_key
+        ]
+        columns = ', '.join(quote_name(field.column) for field in fields)
+        username_column = quote_name(opts.get_field('username').column)
+        email_column = quote_name(opts.get_field('email').column)
+        # DO UPDATE без изменений нужен, чтобы RETURNING вернул id
+        # существующего пользователя: DO NOTHING строк не возвращает.
+        sql = (
+            f'INSERT INTO {table} ({columns}) '
+            f'VALUES ({", ".join(["%s"] * len(fields))}) '
+            f'ON CONFLICT ({username_column}) DO UPDATE '
+            f'SET {email_column} = excluded.{email_column} '
+            f'WHERE {table}.{email_column} = excluded.{email_column} '
+            # Занятый другим пользователем email тоже не ошибка.
+            'ON CONFLICT DO NOTHING '
+            f'RETURNING {quote_name(opts.pk.column)}'
+        )
+        user = self.model(username=username, email=email)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, get_db_values(user, fields))
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def signup_orm(self, username, email):
+        """Регистрация без RETURNING, результат как у signup."""
+        user_ids = self.filter(
+            username=username, email=email
+        ).values_list('pk', flat=True)
+        user_id = user_ids.first()
+        if user_id is not None:
+            return user_id
+        try:
+            with transaction.atomic():
+                return self.create(username=username, email=email).pk
+        except IntegrityError:
+            # Пользователя создал параллельный запрос.
+            return user_ids.first()
+
+
 class MyUser(AbstractUser):
     """Модифицированная модель пользователя."""
     USER = 'user'
@@ -125,11 +213,6 @@ class MyUser(AbstractUser):
         max_length=MAX_LENGTH_BIO,
         blank=True,
     )
-    confirmation_code = models.CharField(
-        max_length=5,
-        blank=True,
-        null=True
-    )
     email = models.EmailField(
         max_length=MAX_LENGTH_EMAIL,
         unique=True
@@ -149,6 +232,8 @@ class MyUser(AbstractUser):
         help_text='Имя пользователя не должно быть "me".'
     )
 
+    objects = MyUserManager()
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -206,6 +291,14 @@ class Review(models.Model):
                 fields=['title', 'author'], name='unique_title_author'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=['author', 'pub_date'], name='review_author_pub_date'
+            ),
+            models.Index(
+                fields=['pub_date', 'id'], name='review_pub_date_id'
+            ),
+        )
         ordering = ('pub_date',)
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -238,9 +331,107 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = (
+            models.Index(
+                fields=['author', 'pub_date'], name='comment_author_pub_date'
+            ),
+        )
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text[:MAX_LENGTH_COMMENT]
+
+
+class EmailOutboxQuerySet(models.QuerySet):
+    """Набор запросов для писем исходящей очереди."""
+
+    def pending(self, max_attempts):
+        """Неотправленные письма, у которых остались попытки отправки."""
+        return self.filter(
+            sent_at__isnull=True, attempts__lt=max_attempts
+        ).order_by('id')
+
+
+class EmailOutbox(models.Model):
+    """
+    Письмо исходящей очереди. Записывается в транзакции вместе с
+    изменениями, которые его порождают, и отправляется командой
+    send_outbox_emails.
+    """
+    subject = models.CharField(
+        max_length=MAX_LENGTH_NAME,
+        verbose_name='Тема'
+    )
+    body = models.TextField(
+        verbose_name='Текст письма'
+    )
+    from_email = models.EmailField(
+        max_length=MAX_LENGTH_EMAIL,
+        verbose_name='Отправитель'
+    )
+    recipient = models.EmailField(
+        max_length=MAX_LENGTH_EMAIL,
+        verbose_name='Получатель'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата отправки'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Количество попыток отправки'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка отправки'
+    )
+
+    objects = EmailOutboxQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=['sent_at', 'id'], name='email_outbox_sent_at_id'
+            ),
+        )
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
+
+
+class RevokedToken(models.Model):
+    """
+    Отозванный refresh-токен. Вместе с ним отзываются access-токены,
+    выданные по нему. Запись нужна до истечения срока действия токена.
+    """
+    jti = models.CharField(
+        max_length=MAX_LENGTH_JTI,
+        unique=True,
+        verbose_name='Идентификатор токена'
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Срок действия токена'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата отзыва'
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Отозванный токен'
+        verbose_name_plural = 'Отозванные токены'
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,33 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api_yamdb.settings import SQLITE_PRAGMAS
+from .models import Review, Title
+
+
+def apply_pragmas(connection, pragmas):
+    """
+    Выполняет PRAGMA на соединении sqlite3. Запросы идут мимо курсора
+    Django, поэтому не попадают в подсчёт SQL-запросов.
+    """
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite по SQLITE_PRAGMAS."""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, SQLITE_PRAGMAS)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_title_rating(sender, instance, **kwargs):
+    """
+    Пересчитывает сохранённый рейтинг произведения при любом изменении
+    отзыва, в том числе при каскадном удалении вместе с автором.
+    Пересчёт идёт в той же транзакции, что и изменение отзыва.
+    """
+    Title.objects.filter(pk=instance.title_id).update_rating()
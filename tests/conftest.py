@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+from django.conf import settings
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +34,39 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.plugins.query_budget',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(tmp_path_factory):
+    """
+    Тестовая база - файл, а не база в памяти: в общей базе в памяти
+    SQLite блокирует таблицы без ожидания, и одновременные запросы
+    из нескольких потоков падают с `database table is locked`.
+    """
+    settings.DATABASES['default']['TEST']['NAME'] = str(
+        tmp_path_factory.mktemp('db') / 'test_db.sqlite3'
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_revocation_list():
+    """
+    Таблица отозванных токенов в начале теста пуста, поэтому фильтр
+    отзыва не перестраивается запросом к базе внутри теста.
+    """
+    from api.revocation import revocation_list
+
+    revocation_list.reset()
+
+
+@pytest.fixture(autouse=True)
+def no_throttling(monkeypatch):
+    """
+    Тесты регистрируют много пользователей с одного адреса, поэтому
+    ограничение частоты включают только тесты throttling.
+    """
+    from api import throttling
+
+    monkeypatch.setattr(throttling, 'THROTTLE_ENABLED', False)
@@ -0,0 +1,79 @@
+import sys
+from collections import Counter, defaultdict
+
+import pytest
+from django.db import connection
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from api.call_site import get_call_site
+from tests.query_budgets import QUERY_BUDGET_PAGE_SIZE, QUERY_BUDGETS
+
+
+class QueryRecorder:
+    """Обёртка выполнения запросов, запоминающая SQL и место вызова."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        library_site, project_site = get_call_site(
+            sys._getframe(1), skip=(__file__,)
+        )
+        if project_site is not None and project_site != library_site:
+            library_site = f'{library_site} <- {project_site}'
+        self.queries.append((library_site, sql))
+        return execute(sql, params, many, context)
+
+
+def get_action(view, request):
+    action = getattr(view, 'action', None) or request.method.lower()
+    return f'{type(view).__name__}.{action}'
+
+
+def format_queries(queries):
+    """SQL запросов, сгруппированный по местам вызова."""
+    by_site = defaultdict(Counter)
+    for site, sql in queries:
+        by_site[site][sql] += 1
+    lines = []
+    for site, statements in sorted(
+        by_site.items(), key=lambda item: -sum(item[1].values())
+    ):
+        lines.append(f'{sum(statements.values())} x {site}')
+        for sql, count in statements.most_common():
+            lines.append(f'    {count} x {sql}')
+    return '\n'.join(lines)
+
+
+def check_query_budget(view, request, queries):
+    action = get_action(view, request)
+    budget = QUERY_BUDGETS.get(action)
+    if budget is None or api_settings.PAGE_SIZE != QUERY_BUDGET_PAGE_SIZE:
+        return
+    if len(queries) > budget:
+        pytest.fail(
+            f'{request.method} {request.path} ({action}) выполняет '
+            f'{len(queries)} SQL-запросов при бюджете {budget} '
+            f'(PAGE_SIZE = {QUERY_BUDGET_PAGE_SIZE}). Запросы по местам '
+            f'вызова:\n{format_queries(queries)}',
+            pytrace=False
+        )
+
+
+@pytest.fixture(autouse=True)
+def query_budget(monkeypatch):
+    """
+    Проверяет каждый запрос к API по бюджету SQL-запросов его действия
+    из tests/query_budgets.py.
+    """
+    dispatch = APIView.dispatch
+
+    def dispatch_with_budget(view, request, *args, **kwargs):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = dispatch(view, request, *args, **kwargs)
+        check_query_budget(view, request, recorder.queries)
+        return response
+
+    monkeypatch.setattr(APIView, 'dispatch', dispatch_with_budget)
@@ -0,0 +1,53 @@
+# Бюджеты SQL-запросов для действий API: максимальное количество запросов
+# на один запрос к API при PAGE_SIZE = QUERY_BUDGET_PAGE_SIZE, включая
+# запрос пользователя при аутентификации по токену.
+# Ключ - <класс вью>.<действие вьюсета или HTTP-метод>.
+QUERY_BUDGET_PAGE_SIZE = 10
+
+QUERY_BUDGETS = {
+    'APIRootView.get': 1,
+
+    'CategoryViewSet.list': 3,
+    'CategoryViewSet.create': 3,
+    'CategoryViewSet.destroy': 5,
+
+    'GenreViewSet.list': 3,
+    'GenreViewSet.create': 3,
+    'GenreViewSet.destroy': 5,
+
+    'TitleViewSet.list': 4,
+    'TitleViewSet.retrieve': 3,
+    'TitleViewSet.create': 10,
+    'TitleViewSet.partial_update': 6,
+    'TitleViewSet.destroy': 7,
+    'TitleViewSet.export': 1,
+
+    'ReviewViewSet.list': 4,
+    'ReviewViewSet.retrieve': 3,
+    'ReviewViewSet.create': 6,
+    'ReviewViewSet.partial_update': 5,
+    'ReviewViewSet.destroy': 7,
+
+    'ReviewFeedViewSet.latest': 2,
+    'ReviewFeedViewSet.export': 1,
+
+    'CommentViewSet.list': 4,
+    'CommentViewSet.retrieve': 3,
+    'CommentViewSet.create': 4,
+    'CommentViewSet.partial_update': 4,
+    'CommentViewSet.destroy': 4,
+
+    'UserViewSet.list': 3,
+    'UserViewSet.retrieve': 2,
+    'UserViewSet.create': 4,
+    'UserViewSet.partial_update': 3,
+    'UserViewSet.destroy': 12,
+    'UserViewSet.users_me': 2,
+    'UserViewSet.users_me_reviews': 2,
+    'UserViewSet.users_me_comments': 2,
+
+    'SignUpAPIView.post': 5,
+    'TokenApiView.post': 2,
+    'TokenRefreshApiView.post': 2,
+    'TokenRevokeApiView.post': 4,
+}
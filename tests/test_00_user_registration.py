@@ -6,7 +6,8 @@ from django.db.utils import IntegrityError
 
 from tests.utils import (
     invalid_data_for_user_patch_and_creation,
-    invalid_data_for_username_and_email_fields
+    invalid_data_for_username_and_email_fields,
+    send_outbox_emails
 )
 
 
@@ -112,6 +113,7 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.URL_SIGNUP, data=valid_data)
+        send_outbox_emails()
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -161,6 +163,7 @@ class Test00UserRegistration:
         response = admin_client.post(
             self.URL_ADMIN_CREATE_USER, data=valid_data
         )
+        send_outbox_emails()
         outbox_after = mail.outbox
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08UsersMeActivityAPI:
+
+    USERS_ME_REVIEWS_URL = '/api/v1/users/me/reviews/'
+    USERS_ME_COMMENTS_URL = '/api/v1/users/me/comments/'
+
+    def test_01_users_me_activity_not_auth(self, client):
+        for url in (self.USERS_ME_REVIEWS_URL, self.USERS_ME_COMMENTS_URL):
+            response = client.get(url)
+            assert response.status_code != HTTPStatus.NOT_FOUND, (
+                f'Эндпоинт `{url}` не найден, проверьте настройки в '
+                '*urls.py*.'
+            )
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что GET-запрос неавторизованного пользователя к '
+                f'`{url}` возвращает ответ со статусом 401.'
+            )
+
+    def test_02_users_me_reviews(self, admin_client, admin, user_client,
+                                 user, moderator_client, moderator,
+                                 django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+
+        with django_assert_max_num_queries(2):
+            response = user_client.get(self.USERS_ME_REVIEWS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.USERS_ME_REVIEWS_URL}` возвращает ответ со статусом 200 '
+            'и выполняется одним запросом к таблице отзывов.'
+        )
+        data = response.json()
+        for key in ('next', 'previous', 'results'):
+            assert key in data, (
+                f'Проверьте, что для эндпоинта `{self.USERS_ME_REVIEWS_URL}` '
+                f'настроена пагинация и ответ содержит ключ `{key}`.'
+            )
+        user_reviews = [
+            review for review in reviews if review['author'] == user.username
+        ]
+        assert [obj['id'] for obj in data['results']] == [
+            review['id'] for review in user_reviews
+        ], (
+            f'Проверьте, что эндпоинт `{self.USERS_ME_REVIEWS_URL}` '
+            'возвращает только отзывы текущего пользователя.'
+        )
+        assert data['results'][0]['title'] == titles[0]['name'], (
+            f'Проверьте, что эндпоинт `{self.USERS_ME_REVIEWS_URL}` '
+            'возвращает название произведения в поле `title`.'
+        )
+
+    def test_03_users_me_comments(self, admin_client, admin, user_client,
+                                  user, moderator_client, moderator,
+                                  django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        with django_assert_max_num_queries(2):
+            response = moderator_client.get(self.USERS_ME_COMMENTS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.USERS_ME_COMMENTS_URL}` возвращает ответ со статусом '
+            '200 и выполняется одним запросом к таблице комментариев.'
+        )
+        results = response.json()['results']
+        moderator_comments = [
+            comment for comment in comments
+            if comment['author'] == moderator.username
+        ]
+        assert len(results) == len(moderator_comments), (
+            f'Проверьте, что эндпоинт `{self.USERS_ME_COMMENTS_URL}` '
+            'возвращает только комментарии текущего пользователя.'
+        )
+        assert results[0]['text'] == moderator_comments[0]['text']
+        assert results[0]['review'] == reviews[0]['id'], (
+            f'Проверьте, что эндпоинт `{self.USERS_ME_COMMENTS_URL}` '
+            'возвращает id отзыва в поле `review`.'
+        )
+        assert results[0]['title'] == titles[0]['name'], (
+            f'Проверьте, что эндпоинт `{self.USERS_ME_COMMENTS_URL}` '
+            'возвращает название произведения в поле `title`.'
+        )
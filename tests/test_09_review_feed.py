@@ -0,0 +1,155 @@
+import csv
+import io
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from reviews.models import Review
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09ReviewFeedAPI:
+
+    LATEST_REVIEWS_URL = '/api/v1/reviews/latest/'
+    REVIEWS_EXPORT_URL = '/api/v1/reviews/export/'
+    EXPORT_FIELDS = ['id', 'title_id', 'author', 'score', 'pub_date']
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_01_latest_reviews(self, client, admin_client, admin,
+                               user_client, user, moderator_client,
+                               moderator, django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+
+        with django_assert_max_num_queries(1):
+            response = client.get(self.LATEST_REVIEWS_URL)
+        assert response.status_code != HTTPStatus.NOT_FOUND, (
+            f'Эндпоинт `{self.LATEST_REVIEWS_URL}` не найден, проверьте '
+            'настройки в *urls.py*.'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.LATEST_REVIEWS_URL}` возвращает ответ со статусом 200 и '
+            'выполняется одним запросом к базе данных.'
+        )
+        data = response.json()
+        for key in ('next', 'previous', 'results'):
+            assert key in data, (
+                f'Проверьте, что для эндпоинта `{self.LATEST_REVIEWS_URL}` '
+                f'настроена пагинация и ответ содержит ключ `{key}`.'
+            )
+        assert [obj['id'] for obj in data['results']] == [
+            review['id'] for review in reversed(reviews)
+        ], (
+            f'Проверьте, что эндпоинт `{self.LATEST_REVIEWS_URL}` '
+            'возвращает отзывы от новых к старым.'
+        )
+        assert data['results'][0]['title'] == titles[0]['name']
+        assert data['results'][0]['author'] == moderator.username
+
+    def test_02_latest_reviews_first_page_cached(self, client, admin_client,
+                                                 admin, user_client, user,
+                                                 django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        first_response = client.get(self.LATEST_REVIEWS_URL)
+
+        create_single_review(user_client, titles[0]['id'], 'fresh review', 7)
+        with django_assert_num_queries(0):
+            response = client.get(self.LATEST_REVIEWS_URL)
+        assert response.json() == first_response.json(), (
+            f'Проверьте, что первая страница `{self.LATEST_REVIEWS_URL}` '
+            'кешируется на несколько секунд.'
+        )
+
+        cache.clear()
+        response = client.get(self.LATEST_REVIEWS_URL)
+        assert response.json()['results'][0]['text'] == 'fresh review'
+
+    def test_03_reviews_export_permissions(self, client, user_client,
+                                           moderator_client):
+        response = client.get(self.REVIEWS_EXPORT_URL)
+        assert response.status_code != HTTPStatus.NOT_FOUND, (
+            f'Эндпоинт `{self.REVIEWS_EXPORT_URL}` не найден, проверьте '
+            'настройки в *urls.py*.'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.REVIEWS_EXPORT_URL}` возвращает ответ со статусом 401.'
+        )
+        for role_client in (user_client, moderator_client):
+            response = role_client.get(self.REVIEWS_EXPORT_URL)
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что GET-запрос не администратора к '
+                f'`{self.REVIEWS_EXPORT_URL}` возвращает ответ со статусом '
+                '403.'
+            )
+
+    def test_04_reviews_export(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        Review.objects.filter(pk=reviews[0]['id']).update(
+            pub_date=datetime(2019, 9, 24, tzinfo=timezone.utc)
+        )
+
+        response = admin_client.get(self.REVIEWS_EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос администратора к '
+            f'`{self.REVIEWS_EXPORT_URL}` возвращает ответ со статусом 200.'
+        )
+        assert response['Content-Type'] == 'text/csv'
+        rows = list(csv.reader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        assert rows[0] == self.EXPORT_FIELDS
+        assert [row[:4] for row in rows[1:]] == [
+            [str(review['id']), str(titles[0]['id']), review['author'],
+             str(review['score'])]
+            for review in reviews
+        ], (
+            f'Проверьте, что эндпоинт `{self.REVIEWS_EXPORT_URL}` выгружает '
+            'все отзывы в порядке публикации.'
+        )
+
+        response = admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'since': '2020-01-01'}
+        )
+        rows = list(csv.reader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        assert [int(row[0]) for row in rows[1:]] == [reviews[1]['id']], (
+            f'Проверьте, что эндпоинт `{self.REVIEWS_EXPORT_URL}` с '
+            'параметром `since` выгружает только более новые отзывы.'
+        )
+
+        response = admin_client.get(
+            self.REVIEWS_EXPORT_URL, {'since': 'yesterday'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_EXPORT_URL}` с '
+            'некорректным `since` возвращает ответ со статусом 400.'
+        )
+
+    def test_05_export_reviews_command(self, admin_client, admin):
+        reviews, _ = create_reviews(admin_client, {admin: admin_client})
+        output = io.StringIO()
+        call_command('export_reviews', stdout=output)
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        assert rows[0] == self.EXPORT_FIELDS
+        assert [int(row[0]) for row in rows[1:]] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что команда `export_reviews` выгружает все отзывы.'
+        )
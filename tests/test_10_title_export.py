@@ -0,0 +1,97 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleExportAPI:
+
+    TITLES_EXPORT_URL = '/api/v1/titles/export/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_titles_export_permissions(self, client, user_client,
+                                          moderator_client):
+        response = client.get(self.TITLES_EXPORT_URL)
+        assert response.status_code != HTTPStatus.NOT_FOUND, (
+            f'Эндпоинт `{self.TITLES_EXPORT_URL}` не найден, проверьте '
+            'настройки в *urls.py*.'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.TITLES_EXPORT_URL}` возвращает ответ со статусом 401.'
+        )
+        for role, role_client in (('пользователя', user_client),
+                                  ('модератора', moderator_client)):
+            response = role_client.get(self.TITLES_EXPORT_URL)
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что GET-запрос {role} к '
+                f'`{self.TITLES_EXPORT_URL}` возвращает ответ со статусом '
+                '403.'
+            )
+
+    def test_02_titles_export(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+
+        response = admin_client.get(self.TITLES_EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос администратора к '
+            f'`{self.TITLES_EXPORT_URL}` возвращает ответ со статусом 200.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == len(titles), (
+            f'Проверьте, что эндпоинт `{self.TITLES_EXPORT_URL}` выгружает '
+            'по одной строке на каждое произведение.'
+        )
+        for line, title in zip(lines, titles):
+            expected = admin_client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title['id'])
+            ).json()
+            assert json.loads(line) == expected, (
+                f'Проверьте, что каждая строка `{self.TITLES_EXPORT_URL}` '
+                'совпадает с ответом на GET-запрос к произведению, '
+                'включая рейтинг.'
+            )
+
+    def test_03_titles_export_filters(self, admin_client):
+        _, titles = create_reviews(admin_client, {})
+
+        response = admin_client.get(
+            self.TITLES_EXPORT_URL, {'name': titles[1]['name']}
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line)['id'] for line in lines] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что эндпоинт `{self.TITLES_EXPORT_URL}` '
+            'поддерживает те же фильтры, что и список произведений.'
+        )
+
+    def test_04_titles_export_rating_after_cascade(self, admin_client,
+                                                    user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'плохо', 2)
+        create_single_review(admin_client, title_id, 'отлично', 10)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        expected = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        ).json()
+        assert expected['rating'] == 10
+
+        response = admin_client.get(self.TITLES_EXPORT_URL)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        exported = {
+            item['id']: item for item in map(json.loads, lines)
+        }
+        assert exported[title_id] == expected, (
+            f'Проверьте, что рейтинг в `{self.TITLES_EXPORT_URL}` '
+            'пересчитывается при каскадном удалении отзывов вместе '
+            'с автором.'
+        )
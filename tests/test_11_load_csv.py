@@ -0,0 +1,237 @@
+import csv
+import io
+import os
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.management.commands.load_csv_com import (
+    MODELS_FILENAME, get_load_order
+)
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, MyUser, Review, Title
+)
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_csv_rows(file_name):
+    with open(os.path.join(DATA_PATH, file_name), encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+def append_csv_rows(file_path, rows):
+    with open(file_path, encoding='utf-8') as file:
+        content = file.read()
+    fieldnames = next(csv.reader(io.StringIO(content)))
+    with open(file_path, 'a', encoding='utf-8', newline='') as file:
+        if not content.endswith('\n'):
+            file.write('\n')
+        csv.DictWriter(file, fieldnames=fieldnames).writerows(rows)
+
+
+@pytest.fixture
+def data_copy(tmp_path):
+    shutil.copytree(DATA_PATH, tmp_path / 'data')
+    return tmp_path / 'data'
+
+
+def assert_ratings():
+    for title in Title.objects.all():
+        scores = [review.score for review in title.reviews.all()]
+        expected = int(sum(scores) / len(scores)) if scores else None
+        assert title.rating == expected, (
+            'Проверьте, что после загрузки отзывов командой '
+            '`load_csv_com` пересчитывается рейтинг произведений.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11LoadCsvCommand:
+
+    @pytest.mark.parametrize('batch_size,jobs', ((7, 1), (7, 2), (5000, 2)))
+    def test_01_load_csv(self, batch_size, jobs, tmp_path):
+        manifest = tmp_path / 'manifest.json'
+        call_command(
+            'load_csv_com', batch_size=batch_size, jobs=jobs,
+            manifest=manifest
+        )
+        for model, file_name in MODELS_FILENAME.items():
+            assert model.objects.count() == count_csv_rows(file_name), (
+                'Проверьте, что команда `load_csv_com` загружает все строки '
+                f'файла `{file_name}`.'
+            )
+
+    def test_02_load_csv_updates_rating(self, tmp_path):
+        call_command('load_csv_com', manifest=tmp_path / 'manifest.json')
+        assert_ratings()
+
+    def test_03_load_csv_keeps_pub_date(self, tmp_path):
+        call_command('load_csv_com', manifest=tmp_path / 'manifest.json')
+        with open(os.path.join(DATA_PATH, 'review.csv'),
+                  encoding='utf-8') as file:
+            row = next(csv.DictReader(file))
+        assert Review.objects.get(
+            pk=row['id']
+        ).pub_date.isoformat().startswith(row['pub_date'][:19]), (
+            'Проверьте, что команда `load_csv_com` сохраняет дату '
+            'публикации из csv-файла.'
+        )
+
+    def test_04_load_csv_upsert(self, data_copy, tmp_path):
+        manifest = tmp_path / 'manifest.json'
+        call_command('load_csv_com', path=data_copy, manifest=manifest)
+
+        review_path = data_copy / 'review.csv'
+        with open(review_path, encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            fieldnames = reader.fieldnames
+            rows = list(reader)
+        rows[0]['score'] = '1' if rows[0]['score'] != '1' else '2'
+        rows.append(dict(rows[-1], id='100500', author='103', title_id='1'))
+        with open(review_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        output = io.StringIO()
+        call_command(
+            'load_csv_com', path=data_copy, upsert=True, manifest=manifest,
+            stdout=output
+        )
+        lines = output.getvalue().splitlines()
+        skipped = [line for line in lines if 'пропущен' in line]
+        assert len(skipped) == len(MODELS_FILENAME) - 1, (
+            'Проверьте, что в режиме `--upsert` команда `load_csv_com` '
+            'пропускает файлы, не изменившиеся с прошлой загрузки.'
+        )
+        assert 'записано строк: 2' in output.getvalue(), (
+            'Проверьте, что в режиме `--upsert` команда `load_csv_com` '
+            'записывает только новые и изменившиеся строки.'
+        )
+        assert Review.objects.get(pk=rows[0]['id']).score == int(
+            rows[0]['score']
+        )
+        assert Review.objects.filter(pk=100500).exists()
+        assert Review.objects.count() == len(rows)
+
+    def test_05_load_order(self):
+        levels = get_load_order(list(MODELS_FILENAME))
+        assert [set(level) for level in levels] == [
+            {MyUser, Category, Genre},
+            {Title},
+            {GenreTitle, Review},
+            {Comment},
+        ], (
+            'Проверьте, что команда `load_csv_com` загружает файлы в '
+            'порядке зависимостей по внешним ключам.'
+        )
+
+    def test_06_generate_csv_data(self, tmp_path):
+        output = tmp_path / 'generated'
+        call_command(
+            'generate_csv_data', '--reviews=2k', titles=50, users=500,
+            seed=1, output=output, stdout=io.StringIO()
+        )
+        call_command(
+            'load_csv_com', path=output, jobs=1,
+            manifest=tmp_path / 'manifest.json', stdout=io.StringIO()
+        )
+        assert Review.objects.count() == 2000, (
+            'Проверьте, что команда `generate_csv_data` генерирует заданное '
+            'количество отзывов, которые загружаются командой '
+            '`load_csv_com`.'
+        )
+        assert Title.objects.count() == 50
+        assert MyUser.objects.count() == 500
+        assert Comment.objects.count() == 1000
+        counts = sorted(
+            (title.reviews.count() for title in Title.objects.all()),
+            reverse=True
+        )
+        assert counts[0] > 10 * counts[-1], (
+            'Проверьте, что команда `generate_csv_data` распределяет отзывы '
+            'по произведениям неравномерно.'
+        )
+
+    def test_07_load_csv_rejects(self, data_copy, tmp_path):
+        append_csv_rows(data_copy / 'titles.csv', (
+            {'id': '100500', 'name': 'Будущее', 'year': '3000',
+             'category': '1'},
+        ))
+        append_csv_rows(data_copy / 'review.csv', (
+            {'id': '100501', 'title_id': '1', 'text': 'Много',
+             'author': '103', 'score': '11', 'pub_date': ''},
+            {'id': '100502', 'title_id': '100500', 'text': 'Нет такого',
+             'author': '103', 'score': '5', 'pub_date': ''},
+            {'id': '100503', 'title_id': '1', 'text': 'Нет автора',
+             'author': '100500', 'score': '5', 'pub_date': ''},
+        ))
+
+        rejects = tmp_path / 'rejects'
+        output = io.StringIO()
+        call_command(
+            'load_csv_com', path=data_copy, rejects=rejects,
+            manifest=tmp_path / 'manifest.json', stdout=output
+        )
+        assert Title.objects.count() == count_csv_rows('titles.csv'), (
+            'Проверьте, что команда `load_csv_com` не прерывает загрузку '
+            'файла из-за некорректных строк.'
+        )
+        assert Review.objects.count() == count_csv_rows('review.csv')
+        assert not Title.objects.filter(pk=100500).exists()
+        assert not Review.objects.filter(pk__gt=100500).exists(), (
+            'Проверьте, что команда `load_csv_com` не загружает строки с '
+            'некорректной оценкой и ссылками на несуществующие записи.'
+        )
+        assert 'отклонено строк: 3' in output.getvalue()
+
+        with open(rejects / 'review.rejects.csv', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        assert [row['id'] for row in rows] == ['100501', '100502', '100503'], (
+            'Проверьте, что команда `load_csv_com` сохраняет отклонённые '
+            'строки в файл.'
+        )
+        assert 'score' in rows[0]['errors']
+        assert 'title_id' in rows[1]['errors']
+        assert 'author_id' in rows[2]['errors']
+        with open(rejects / 'titles.rejects.csv', encoding='utf-8') as file:
+            assert 'year' in next(csv.DictReader(file))['errors']
+
+    def test_08_load_csv_upsert_rating(self, data_copy, tmp_path):
+        manifest = tmp_path / 'manifest.json'
+        call_command('load_csv_com', path=data_copy, manifest=manifest)
+
+        review_path = data_copy / 'review.csv'
+        with open(review_path, encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            fieldnames = reader.fieldnames
+            rows = list(reader)
+        other_title = Title.objects.exclude(pk=rows[0]['title_id']).first()
+        rows[0]['title_id'] = str(other_title.pk)
+        with open(review_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        call_command(
+            'load_csv_com', path=data_copy, upsert=True, manifest=manifest,
+            stdout=io.StringIO()
+        )
+        assert_ratings()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                'load_csv_com', path=data_copy, upsert=True,
+                manifest=manifest, stdout=io.StringIO()
+            )
+        assert not any(
+            'UPDATE "reviews_title"' in query['sql']
+            for query in queries.captured_queries
+        ), (
+            'Проверьте, что команда `load_csv_com` не пересчитывает '
+            'рейтинг, если отзывы не изменились.'
+        )
@@ -0,0 +1,60 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12BenchmarkApiCommand:
+
+    ROUTES = (
+        'GET title-list', 'GET title-detail', 'GET review-list',
+        'GET comment-list', 'GET user-me', 'POST signup', 'POST token',
+    )
+    RESULT_KEYS = (
+        'path', 'status', 'p50_ms', 'p95_ms', 'p99_ms', 'queries',
+        'peak_memory_kb',
+    )
+
+    def run_benchmark(self, output, **kwargs):
+        call_command(
+            'benchmark_api', '--reviews=300', requests=3, warmup=1,
+            current_db=True, output=output, stdout=io.StringIO(), **kwargs
+        )
+        with open(output, encoding='utf-8') as file:
+            return json.load(file)
+
+    def test_01_benchmark_report(self, tmp_path):
+        report = self.run_benchmark(tmp_path / 'report.json')
+        for route in self.ROUTES:
+            assert route in report['routes'], (
+                'Проверьте, что команда `benchmark_api` замеряет маршрут '
+                f'`{route}`.'
+            )
+        for route, result in report['routes'].items():
+            for key in self.RESULT_KEYS:
+                assert key in result, (
+                    'Проверьте, что отчёт команды `benchmark_api` содержит '
+                    f'`{key}` для каждого маршрута.'
+                )
+            assert result['status'] < 400, (
+                f'Проверьте, что команда `benchmark_api` выполняет корректный '
+                f'запрос к маршруту `{route}`.'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['queries'] > 0 or route in (
+                'GET api-root', 'GET review-feed-latest'
+            )
+
+    def test_02_benchmark_compare(self, tmp_path):
+        baseline = self.run_benchmark(tmp_path / 'baseline.json')
+        baseline['routes']['GET title-list']['queries'] -= 1
+        with open(tmp_path / 'baseline.json', 'w', encoding='utf-8') as file:
+            json.dump(baseline, file)
+        with pytest.raises(CommandError, match='title-list'):
+            self.run_benchmark(
+                tmp_path / 'report.json',
+                compare=tmp_path / 'baseline.json', threshold=100
+            )
@@ -0,0 +1,111 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from tests.plugins.query_budget import check_query_budget
+from tests.query_budgets import QUERY_BUDGET_PAGE_SIZE
+
+OBJECTS_COUNT = QUERY_BUDGET_PAGE_SIZE + 2
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    users = [
+        django_user_model.objects.create(
+            username=f'budget_user_{index}',
+            email=f'budget_user_{index}@yamdb.fake'
+        )
+        for index in range(OBJECTS_COUNT)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(OBJECTS_COUNT)
+    ]
+    titles = []
+    for index in range(OBJECTS_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {index}',
+            year=2000,
+            category=Category.objects.create(
+                name=f'Категория {index}', slug=f'category-{index}'
+            )
+        )
+        title.genre.set(genres[:index + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        for user in users
+    ]
+    for user in users:
+        Comment.objects.create(
+            review=reviews[0], author=user, text='Комментарий'
+        )
+    return users[0], titles[0], reviews[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13QueryBudgets:
+
+    def test_01_list_endpoints_within_budget(self, catalog, admin_client):
+        user, title, review = catalog
+        user_client = APIClient()
+        user_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            '/api/v1/reviews/latest/',
+            '/api/v1/users/',
+        )
+        for url in urls:
+            response = admin_client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+                'со статусом 200.'
+            )
+        for url in ('/api/v1/users/me/reviews/',
+                    '/api/v1/users/me/comments/'):
+            assert user_client.get(url).status_code == 200
+
+    def test_02_budget_exceeded(self, catalog, admin_client, monkeypatch):
+        monkeypatch.setattr(
+            'tests.plugins.query_budget.QUERY_BUDGETS',
+            {'TitleViewSet.list': 1}
+        )
+        with pytest.raises(pytest.fail.Exception) as error:
+            admin_client.get('/api/v1/titles/')
+        assert 'TitleViewSet.list' in str(error.value)
+        assert 'reviews_title' in str(error.value), (
+            'Проверьте, что при превышении бюджета выводятся SQL-запросы.'
+        )
+
+    def test_03_budget_skipped_for_other_page_size(self, monkeypatch):
+        monkeypatch.setattr(
+            'tests.plugins.query_budget.QUERY_BUDGETS',
+            {'TitleViewSet.list': 0}
+        )
+        monkeypatch.setattr(
+            'rest_framework.settings.api_settings.PAGE_SIZE',
+            QUERY_BUDGET_PAGE_SIZE + 1,
+            raising=False
+        )
+
+        class View:
+            action = 'list'
+
+        View.__name__ = 'TitleViewSet'
+
+        class Request:
+            method = 'GET'
+            path = '/api/v1/titles/'
+
+        check_query_budget(View(), Request(), [('site', 'SELECT 1')])
@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import threading
+
+import pytest
+from django.core.management import call_command
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests.conftest import BASE_DIR
+from tests.utils import send_outbox_emails
+
+COLLECTION_PATH = os.path.join(
+    BASE_DIR, 'postman_collection', 'Ymdb-collection.postman_collection.json'
+)
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+@pytest.fixture
+def outbox_worker():
+    """Фоновая отправка писем исходящей очереди на время теста."""
+    stopped = threading.Event()
+
+    def work():
+        while not stopped.wait(0.05):
+            send_outbox_emails()
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    yield
+    stopped.set()
+    thread.join()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ReplayTrafficCommand:
+
+    def test_01_postman_scenario(self, tmp_path):
+        scenario_path = tmp_path / 'scenario.jsonl'
+        call_command(
+            'replay_traffic', COLLECTION_PATH,
+            export_scenario=scenario_path, stdout=io.StringIO()
+        )
+        with open(scenario_path, encoding='utf-8') as file:
+            scenario = [json.loads(line) for line in file]
+        assert scenario, (
+            'Проверьте, что команда `replay_traffic` превращает '
+            'postman-коллекцию в сценарий.'
+        )
+        assert sum(request['weight'] for request in scenario) > len(
+            scenario
+        ), (
+            'Проверьте, что одинаковые запросы коллекции объединяются в '
+            'один запрос с весом.'
+        )
+        token_request = next(
+            request for request in scenario
+            if request['path'] == '/api/v1/auth/token/'
+            and 'adminUsername' in request['body']
+        )
+        assert token_request['captures'] == {'adminToken': 'token'}
+        assert any(
+            request['auth'] == 'adminToken' for request in scenario
+        ), (
+            'Проверьте, что команда `replay_traffic` сохраняет авторизацию '
+            'запросов коллекции.'
+        )
+
+    def test_02_replay_traffic(self, live_server, settings, tmp_path,
+                               admin, outbox_worker):
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend'
+        )
+        settings.EMAIL_FILE_PATH = tmp_path / 'emails'
+        scenario_path = tmp_path / 'scenario.jsonl'
+        write_jsonl(scenario_path, (
+            {'method': 'GET', 'path': '/api/v1/titles/', 'weight': 3},
+            {'method': 'GET', 'path': '/api/v1/users/me/', 'auth': 'user'},
+            {'method': 'GET', 'path': '/api/v1/users/', 'auth': 'admin'},
+            {'method': 'POST', 'path': '/api/v1/categories/',
+             'auth': 'admin', 'body': {'name': 'Кино', 'slug': 'films'},
+             'captures': {'categorySlug': 'slug'}, 'weight': 0},
+            {'method': 'GET', 'path': '/api/v1/categories/?search=Кино',
+             'auth': 'admin', 'captures': {}},
+            {'method': 'GET', 'path': '/api/v1/titles/{{unknown}}/'},
+        ))
+        output = tmp_path / 'report.json'
+        call_command(
+            'replay_traffic', str(scenario_path),
+            base_url=live_server.url,
+            account=['user=replay-user:replay@yamdb.fake'],
+            token=[f'admin={AccessToken.for_user(admin)}'],
+            requests=30, concurrency=2, seed=1, output=output,
+            stdout=io.StringIO()
+        )
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+        assert report['requests'] == 30, (
+            'Проверьте, что команда `replay_traffic` отправляет заданное '
+            'количество запросов.'
+        )
+        assert set(report['routes']) == {
+            'GET title-list', 'GET user-me', 'GET user-list',
+            'GET category-list'
+        }, (
+            'Проверьте, что команда `replay_traffic` группирует задержки '
+            'по маршрутам и пропускает запросы с неизвестными переменными.'
+        )
+        for route, result in report['routes'].items():
+            assert result['statuses'] == {'200': result['requests']}, (
+                'Проверьте, что команда `replay_traffic` получает токены '
+                f'через signup и token: маршрут `{route}` вернул '
+                f'{result["statuses"]}.'
+            )
+            assert sum(result['histogram_ms'].values()) == result['requests']
+            assert 'total' in result['server_timing_ms'], (
+                'Проверьте, что команда `replay_traffic` усредняет фазы '
+                'заголовка `Server-Timing` по маршрутам.'
+            )
@@ -0,0 +1,107 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api import metrics, views
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Metrics:
+
+    METRICS_URL = '/metrics'
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.registry.reset()
+        yield
+        metrics.registry.reset()
+
+    def test_01_metrics_endpoint(self, client):
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/100500/')
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{self.METRICS_URL}` доступен с '
+            'локального адреса.'
+        )
+        assert response['Content-Type'].startswith('text/plain')
+        content = response.content.decode()
+        route = 'route="title-list",method="GET"'
+        for line in (
+            f'yamdb_http_requests_total{{{route},status="200"}} 2',
+            'yamdb_http_requests_total{route="title-detail",method="GET",'
+            'status="404"} 1',
+            f'yamdb_http_request_duration_seconds_bucket{{{route},'
+            'le="+Inf"} 2',
+            f'yamdb_http_request_duration_seconds_count{{{route}}} 2',
+            f'yamdb_http_response_size_bytes_count{{{route}}} 2',
+        ):
+            assert line in content, (
+                f'Проверьте, что эндпоинт `{self.METRICS_URL}` отдаёт '
+                f'метрики по маршрутам в формате Prometheus: `{line}`.'
+            )
+        queries = next(
+            line for line in content.splitlines()
+            if line.startswith(f'yamdb_db_queries_total{{{route}}}')
+        )
+        assert int(queries.rsplit(' ', 1)[1]) > 0, (
+            'Проверьте, что метрики содержат количество SQL-запросов '
+            'маршрута.'
+        )
+
+    def test_02_metrics_internal_only(self, client):
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='10.1.2.3')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что эндпоинт `{self.METRICS_URL}` недоступен с '
+            'адресов не из METRICS_ALLOWED_IPS.'
+        )
+
+    def test_02_metrics_token(self, client, monkeypatch):
+        monkeypatch.setattr(views, 'METRICS_TOKEN', 'secret')
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что при заданном METRICS_TOKEN эндпоинт '
+            f'`{self.METRICS_URL}` недоступен без токена.'
+        )
+        response = client.get(
+            self.METRICS_URL, HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_metrics_streaming(self, admin_client):
+        create_titles(admin_client)
+        metrics.registry.reset()
+        response = admin_client.get('/api/v1/titles/export/')
+        assert b''.join(response.streaming_content)
+        stats = metrics.registry.collect().routes[('title-export', 'GET')]
+        assert stats.statuses == {200: 1}
+        assert stats.queries >= 2, (
+            'Проверьте, что метрики потокового ответа учитывают SQL-запросы, '
+            'выполненные при чтении его содержимого.'
+        )
+
+    def test_03_thread_accumulators(self):
+        def work():
+            for _ in range(100):
+                metrics.increment('yamdb_test_total')
+                metrics.observe_request(
+                    'title-list', 'GET', 200, 0.01, 100, 1, 0.001
+                )
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        work()
+        total = metrics.registry.collect()
+        assert total.counters['yamdb_test_total'] == 500, (
+            'Проверьте, что метрики завершившихся потоков сохраняются.'
+        )
+        stats = total.routes[('title-list', 'GET')]
+        assert stats.statuses == {200: 500}
+        assert sum(stats.latency_buckets) == 500
+        assert stats.queries == 500
@@ -0,0 +1,72 @@
+import json
+import logging
+
+import pytest
+
+from api import middleware
+from api.slow_queries import normalize_sql
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def slow_query_log(monkeypatch, caplog):
+    monkeypatch.setattr(middleware, 'SLOW_QUERY_LOG_THRESHOLD', 0)
+    monkeypatch.setattr(
+        logging.getLogger('api.slow_queries'), 'handlers', [caplog.handler]
+    )
+    return lambda: [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'api.slow_queries'
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SlowQueryLog:
+
+    def test_01_slow_query_entries(self, admin_client, user_client,
+                                   slow_query_log):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        entries = slow_query_log()
+        assert entries, (
+            'Проверьте, что запросы дольше SLOW_QUERY_LOG_THRESHOLD '
+            'пишутся в журнал медленных запросов.'
+        )
+        for key in ('time', 'duration_ms', 'sql', 'view', 'action',
+                    'call_site'):
+            assert key in entries[0], (
+                'Проверьте, что запись журнала медленных запросов '
+                f'содержит `{key}`.'
+            )
+        validate = [
+            entry for entry in entries
+            if entry['view'] == 'ReviewViewSet'
+            and entry['action'] == 'create'
+            and 'ReviewSerializer.validate' in entry['call_site']
+        ]
+        assert validate and validate[0]['call_site'].startswith(
+            'api/serializers.py:'
+        ), (
+            'Проверьте, что запись журнала указывает место вызова '
+            'запроса в коде проекта.'
+        )
+
+    def test_02_slow_query_log_disabled(self, admin_client, caplog):
+        logger = logging.getLogger('api.slow_queries')
+        logger.addHandler(caplog.handler)
+        try:
+            admin_client.get('/api/v1/titles/')
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert not [
+            record for record in caplog.records
+            if record.name == 'api.slow_queries'
+        ], (
+            'Проверьте, что журнал медленных запросов выключен по '
+            'умолчанию.'
+        )
+
+    def test_03_normalize_sql(self):
+        assert normalize_sql(
+            'SELECT *\n  FROM "t"  WHERE "id" IN (%s, %s, %s)'
+        ) == 'SELECT * FROM "t" WHERE "id" IN (%s, ...)'
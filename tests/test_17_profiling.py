@@ -0,0 +1,82 @@
+import pstats
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api import middleware
+from api.views import TitleViewSet
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Profiling:
+
+    URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def profiles(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(middleware, 'PROFILING_ENABLED', True)
+        monkeypatch.setattr(middleware, 'PROFILING_DIR', tmp_path)
+        return tmp_path
+
+    def test_01_cprofile(self, admin_client, profiles):
+        response = admin_client.get(
+            self.URL, HTTP_X_PROFILE='cprofile', HTTP_X_REQUEST_ID='req-1'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Profile-Id'] == 'req-1', (
+            'Проверьте, что ответ на профилируемый запрос содержит '
+            'заголовок `X-Profile-Id` с идентификатором запроса.'
+        )
+        path = profiles / 'req-1.pstats'
+        assert path.exists(), (
+            'Проверьте, что результат cProfile сохраняется в файл с '
+            'идентификатором запроса.'
+        )
+        functions = [
+            function for _, _, function in pstats.Stats(str(path)).stats
+        ]
+        assert 'list' in functions
+
+    def test_02_sample(self, admin_client, profiles, monkeypatch):
+        list_titles = TitleViewSet.list
+
+        def slow_list(view, request, *args, **kwargs):
+            time.sleep(0.05)
+            return list_titles(view, request, *args, **kwargs)
+
+        monkeypatch.setattr(TitleViewSet, 'list', slow_list)
+        response = admin_client.get(self.URL, HTTP_X_PROFILE='sample')
+        profile_id = response['X-Profile-Id']
+        with open(profiles / f'{profile_id}.collapsed',
+                  encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        assert lines, (
+            'Проверьте, что сэмплирующий профилировщик сохраняет стеки '
+            'запроса в файл с идентификатором запроса.'
+        )
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert stack and int(count) > 0, (
+                'Проверьте, что сэмплирующий профилировщик сохраняет стеки '
+                'в формате collapsed stacks.'
+            )
+        assert any('slow_list' in line for line in lines)
+
+    def test_03_profiling_not_allowed(self, client, user_client,
+                                      admin_client, profiles, monkeypatch):
+        for request_client in (client, user_client):
+            response = request_client.get(
+                self.URL, HTTP_X_PROFILE='cprofile'
+            )
+            assert response.status_code == HTTPStatus.OK
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что профилировать запросы может только '
+                'администратор.'
+            )
+        monkeypatch.setattr(middleware, 'PROFILING_ENABLED', False)
+        response = admin_client.get(self.URL, HTTP_X_PROFILE='cprofile')
+        assert 'X-Profile-Id' not in response, (
+            'Проверьте, что профилирование выключено по умолчанию.'
+        )
+        assert not list(profiles.iterdir())
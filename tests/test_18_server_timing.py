@@ -0,0 +1,39 @@
+import pytest
+
+from api import middleware
+from api.server_timing import parse_header
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ServerTiming:
+
+    def test_01_server_timing_header(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get('/api/v1/titles/')
+        assert 'Server-Timing' in response, (
+            'Проверьте, что ответ API содержит заголовок `Server-Timing`.'
+        )
+        durations = parse_header(response['Server-Timing'])
+        assert list(durations) == [
+            'auth', 'perm', 'db', 'serialize', 'render', 'total'
+        ], (
+            'Проверьте, что заголовок `Server-Timing` содержит фазы auth, '
+            'perm, db, serialize, render и total.'
+        )
+        for phase in ('auth', 'db', 'serialize', 'render'):
+            assert durations[phase] > 0, (
+                f'Проверьте, что замеряется время фазы `{phase}`.'
+            )
+        assert sum(
+            duration for phase, duration in durations.items()
+            if phase != 'total'
+        ) <= durations['total'], (
+            'Проверьте, что фазы заголовка `Server-Timing` не '
+            'пересекаются.'
+        )
+
+    def test_02_server_timing_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(middleware, 'SERVER_TIMING_ENABLED', False)
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
@@ -0,0 +1,191 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from reviews.models import EmailOutbox
+from tests.utils import send_outbox_emails
+
+
+class FailingEmailBackend:
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('почтовый сервер недоступен')
+
+
+class FlakyEmailBackend(FailingEmailBackend):
+    """Доставляет два письма, затем теряет соединение."""
+
+    delivered = []
+
+    def send_messages(self, messages):
+        if len(self.delivered) == 2:
+            raise ConnectionError('соединение разорвано')
+        self.delivered.extend(messages)
+        return len(messages)
+
+
+class RefusingEmailBackend(FlakyEmailBackend):
+    """Доставляет одно письмо, затем не может открыть соединение."""
+
+    opened = []
+
+    def open(self):
+        if self.opened:
+            raise ConnectionRefusedError('соединение отклонено')
+        self.opened.append(self)
+
+    def send_messages(self, messages):
+        if self.delivered:
+            raise ConnectionError('соединение разорвано')
+        self.delivered.extend(messages)
+        return len(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, index):
+        return client.post(self.URL_SIGNUP, data={
+            'username': f'outbox_user_{index}',
+            'email': f'outbox_user_{index}@yamdb.fake',
+        })
+
+    def test_01_signup_writes_outbox(self, client):
+        outbox_before_count = len(mail.outbox)
+        response = self.signup(client, 0)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что POST-запрос к `{self.URL_SIGNUP}` не отправляет '
+            'письмо сразу, а записывает его в исходящую очередь.'
+        )
+        email = EmailOutbox.objects.get()
+        assert email.recipient == 'outbox_user_0@yamdb.fake'
+        assert email.sent_at is None
+
+        send_outbox_emails()
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox_emails` отправляет письма '
+            'исходящей очереди.'
+        )
+        assert mail.outbox[-1].to == [email.recipient]
+        assert email.body in mail.outbox[-1].body
+        email.refresh_from_db()
+        assert email.sent_at is not None
+
+        send_outbox_emails()
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_outbox_emails` не отправляет '
+            'письма повторно.'
+        )
+
+    def test_02_batches(self, client):
+        outbox_before_count = len(mail.outbox)
+        for index in range(7):
+            self.signup(client, index)
+        output = io.StringIO()
+        call_command(
+            'send_outbox_emails', once=True, threads=2, batch_size=2,
+            stdout=output
+        )
+        assert len(mail.outbox) == outbox_before_count + 7, (
+            'Проверьте, что команда `send_outbox_emails` отправляет все '
+            'письма очереди пачками из нескольких потоков.'
+        )
+        assert 'Отправлено писем: 7, ошибок: 0' in output.getvalue()
+        assert not EmailOutbox.objects.filter(sent_at__isnull=True).exists()
+
+    def test_03_failed_send(self, client, settings):
+        self.signup(client, 0)
+        settings.EMAIL_BACKEND = (
+            'tests.test_19_email_outbox.FailingEmailBackend'
+        )
+        for _ in range(2):
+            call_command(
+                'send_outbox_emails', once=True, max_attempts=2,
+                stdout=io.StringIO()
+            )
+        email = EmailOutbox.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 2, (
+            'Проверьте, что команда `send_outbox_emails` учитывает '
+            'неудачные попытки отправки.'
+        )
+        assert 'почтовый сервер недоступен' in email.last_error
+
+        output = io.StringIO()
+        call_command(
+            'send_outbox_emails', once=True, max_attempts=2, stdout=output
+        )
+        assert EmailOutbox.objects.get().attempts == 2, (
+            'Проверьте, что команда `send_outbox_emails` не отправляет '
+            'письма, исчерпавшие попытки.'
+        )
+
+    def test_04_partial_batch(self, client, settings, monkeypatch):
+        for index in range(4):
+            self.signup(client, index)
+        settings.EMAIL_BACKEND = (
+            'tests.test_19_email_outbox.FlakyEmailBackend'
+        )
+        monkeypatch.setattr(FlakyEmailBackend, 'delivered', [])
+        output = io.StringIO()
+        call_command(
+            'send_outbox_emails', once=True, threads=1, batch_size=4,
+            stdout=output
+        )
+        assert 'Отправлено писем: 2, ошибок: 2' in output.getvalue()
+        assert EmailOutbox.objects.filter(
+            sent_at__isnull=False
+        ).count() == 2, (
+            'Проверьте, что письма, отправленные до ошибки, отмечаются '
+            'отправленными и не отправляются повторно.'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        outbox_before_count = len(mail.outbox)
+        send_outbox_emails()
+        assert len(mail.outbox) == outbox_before_count + 2
+        delivered = [message.to for message in FlakyEmailBackend.delivered]
+        assert not any(
+            message.to in delivered
+            for message in mail.outbox[outbox_before_count:]
+        )
+
+    def test_05_connection_refused(self, client, settings, monkeypatch):
+        for index in range(4):
+            self.signup(client, index)
+        settings.EMAIL_BACKEND = (
+            'tests.test_19_email_outbox.RefusingEmailBackend'
+        )
+        monkeypatch.setattr(RefusingEmailBackend, 'delivered', [])
+        monkeypatch.setattr(RefusingEmailBackend, 'opened', [])
+        output = io.StringIO()
+        call_command(
+            'send_outbox_emails', once=True, threads=1, batch_size=2,
+            stdout=output
+        )
+        assert 'Отправлено писем: 1, ошибок: 3' in output.getvalue(), (
+            'Проверьте, что ошибка открытия соединения с почтовым сервером '
+            'не прерывает команду `send_outbox_emails`.'
+        )
+        sent = EmailOutbox.objects.filter(sent_at__isnull=False)
+        assert [email.recipient for email in sent] == [
+            message.to[0] for message in RefusingEmailBackend.delivered
+        ]
+        unsent = EmailOutbox.objects.filter(sent_at__isnull=True)
+        assert {email.attempts for email in unsent} == {1}
+        assert 'соединение отклонено' in unsent.last().last_error
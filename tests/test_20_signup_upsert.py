@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import EmailOutbox, MyUser, supports_upsert_returning
+from tests.query_budgets import QUERY_BUDGETS
+
+
+def signup(data):
+    try:
+        return APIClient().post(
+            '/api/v1/auth/signup/', data=data
+        ).status_code
+    finally:
+        connections.close_all()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SignUpUpsert:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_single_statement(self, client):
+        data = {'username': 'upsert_user', 'email': 'upsert@yamdb.fake'}
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.OK
+            user_queries = [
+                query['sql'] for query in queries.captured_queries
+                if 'reviews_myuser' in query['sql']
+            ]
+            assert len(user_queries) == 1, (
+                f'Проверьте, что POST-запрос к `{self.URL_SIGNUP}` создаёт '
+                'пользователя или находит существующего одним '
+                'SQL-запросом.'
+            )
+        assert MyUser.objects.filter(username=data['username']).count() == 1
+        assert EmailOutbox.objects.count() == 2, (
+            'Проверьте, что повторная регистрация отправляет код '
+            'подтверждения.'
+        )
+
+    def test_02_concurrent_signups(self):
+        requests = [
+            {'username': 'race_user', 'email': 'race@yamdb.fake'},
+            {'username': 'race_user', 'email': 'other@yamdb.fake'},
+            {'username': 'other_user', 'email': 'race@yamdb.fake'},
+        ] * 10
+        with ThreadPoolExecutor(8) as executor:
+            statuses = list(executor.map(signup, requests))
+        assert set(statuses) <= {HTTPStatus.OK, HTTPStatus.BAD_REQUEST}, (
+            'Проверьте, что одновременные регистрации с занятыми '
+            '`username` или `email` возвращают ответ со статусом 400 '
+            f'без ошибок сервера: {statuses}.'
+        )
+        users = set(MyUser.objects.values_list('username', 'email'))
+        for data, status in zip(requests, statuses):
+            registered = (data['username'], data['email']) in users
+            assert (status == HTTPStatus.OK) == registered, (
+                'Проверьте, что одновременная регистрация успешна, только '
+                'если `username` и `email` принадлежат одному пользователю.'
+            )
+        assert EmailOutbox.objects.count() == statuses.count(HTTPStatus.OK)
+
+    def test_03_old_sqlite(self, client, monkeypatch):
+        # Без RETURNING регистрация занимает больше запросов.
+        monkeypatch.delitem(QUERY_BUDGETS, 'SignUpAPIView.post')
+        monkeypatch.setattr(
+            connection.Database, 'sqlite_version_info', (3, 31, 1)
+        )
+        data = {'username': 'old_sqlite', 'email': 'old@yamdb.fake'}
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что регистрация работает на SQLite старше 3.35.'
+            )
+            assert not any(
+                'RETURNING' in query['sql']
+                for query in queries.captured_queries
+            )
+        for other in (
+            {'username': data['username'], 'email': 'other@yamdb.fake'},
+            {'username': 'other_user', 'email': data['email']},
+        ):
+            response = client.post(self.URL_SIGNUP, data=other)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert MyUser.objects.count() == 1
+        assert EmailOutbox.objects.count() == 2
+
+    def test_04_other_vendors(self, monkeypatch):
+        assert supports_upsert_returning()
+        monkeypatch.setattr(connection, 'vendor', 'postgresql')
+        assert not supports_upsert_returning(), (
+            'Проверьте, что регистрация одним запросом, написанная для '
+            'SQLite, не используется на других базах.'
+        )
@@ -0,0 +1,73 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+from api import confirmation
+from api_yamdb.settings import CONFIRMATION_CODE_WINDOW
+from tests.utils import send_outbox_emails
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    DATA = {'username': 'code_user', 'email': 'code_user@yamdb.fake'}
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK
+        send_outbox_emails()
+        return re.search(r'Ваш код: (\d+)', mail.outbox[-1].body).group(1)
+
+    def get_token(self, client, code):
+        return client.post(self.URL_TOKEN, data={
+            'username': self.DATA['username'], 'confirmation_code': code
+        })
+
+    def test_01_code_from_email(self, client, monkeypatch):
+        now = 1000 * CONFIRMATION_CODE_WINDOW + 1
+        monkeypatch.setattr(confirmation, 'time', lambda: now)
+        code = self.signup(client)
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код подтверждения из письма позволяет получить '
+            'токен.'
+        )
+        assert 'token' in response.json()
+        assert self.signup(client) == code, (
+            'Проверьте, что код подтверждения зависит только от '
+            'пользователя и окна времени.'
+        )
+
+    def test_02_code_expires(self, client, monkeypatch):
+        now = 1000 * CONFIRMATION_CODE_WINDOW + 1
+        monkeypatch.setattr(confirmation, 'time', lambda: now)
+        code = self.signup(client)
+
+        now += CONFIRMATION_CODE_WINDOW
+        assert self.get_token(client, code).status_code == HTTPStatus.OK, (
+            'Проверьте, что код подтверждения действует в следующем окне '
+            'времени.'
+        )
+        now += CONFIRMATION_CODE_WINDOW
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения перестаёт действовать через '
+            'два окна времени.'
+        )
+
+    def test_03_code_bound_to_user(self, client, user):
+        code = self.signup(client)
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения одного пользователя не '
+            'подходит другому.'
+        )
+        assert confirmation.make_confirmation_code(
+            user.id, user.email
+        ) != confirmation.make_confirmation_code(user.id, 'other@yamdb.fake')
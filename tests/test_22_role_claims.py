@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication
+from api.confirmation import make_confirmation_code
+from api_yamdb.settings import ROLE_CLAIMS_MAX_AGE
+
+
+def get_client(user):
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': make_confirmation_code(user.id, user.email),
+    })
+    assert response.status_code == HTTPStatus.OK
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+    )
+    return client
+
+
+def count_user_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data=data)
+    return response, sum(
+        1 for query in queries.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "reviews_myuser"' in query['sql']
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22RoleClaims:
+
+    def test_01_no_user_query(self, admin, admin_client):
+        response, user_queries = count_user_queries(
+            get_client(admin), 'post', '/api/v1/categories/',
+            {'name': 'Фильм', 'slug': 'film'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert user_queries == 0, (
+            'Проверьте, что токен из `/api/v1/auth/token/` содержит роль '
+            'пользователя и проверка разрешений не загружает пользователя '
+            'из базы.'
+        )
+        response, user_queries = count_user_queries(
+            admin_client, 'post', '/api/v1/categories/',
+            {'name': 'Книга', 'slug': 'book'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert user_queries == 1, (
+            'Проверьте, что токены без роли по-прежнему принимаются.'
+        )
+
+    def test_02_role_change(self, admin, monkeypatch):
+        client = get_client(admin)
+        admin.role = admin.USER
+        admin.save()
+        url = '/api/v1/users/'
+        assert client.get(url).status_code == HTTPStatus.OK
+
+        issued = authentication.time()
+        monkeypatch.setattr(
+            authentication, 'time', lambda: issued + ROLE_CLAIMS_MAX_AGE + 1
+        )
+        response, user_queries = count_user_queries(client, 'get', url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что через ROLE_CLAIMS_MAX_AGE после выдачи токена '
+            'роль пользователя берётся из базы.'
+        )
+        assert user_queries == 1
+
+    def test_03_claims_user(self, user):
+        client = get_client(user)
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == user.bio, (
+            'Проверьте, что эндпоинт `/api/v1/users/me/` возвращает профиль '
+            'пользователя из базы.'
+        )
+        response = client.patch('/api/v1/users/me/', data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'новое'
+        assert user.email == 'testuser@yamdb.fake'
+
+    def test_04_demoted_admin_profile(self, admin):
+        client = get_client(admin)
+        admin.role = admin.USER
+        admin.save()
+        response = client.patch('/api/v1/users/me/', data={'bio': 'новое'})
+        assert response.status_code == HTTPStatus.OK
+        admin.refresh_from_db()
+        assert admin.bio == 'новое'
+        assert admin.role == admin.USER, (
+            'Проверьте, что PATCH-запрос к `/api/v1/users/me/` с токеном, '
+            'выданным до смены роли, не возвращает прежнюю роль.'
+        )
+        assert response.json()['role'] == admin.USER
+
+    def test_05_inactive_user(self, user):
+        user.is_active = False
+        user.save()
+        client = get_client(user)
+        response, user_queries = count_user_queries(
+            client, 'get', '/api/v1/users/me/'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен неактивного пользователя не принимается.'
+        )
+        assert user_queries == 0
+
+    def test_06_token_lifetime(self, user):
+        response = APIClient().post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': make_confirmation_code(user.id, user.email),
+        })
+        token = AccessToken(response.json()['token'])
+        assert token['exp'] - token['iat'] == ROLE_CLAIMS_MAX_AGE, (
+            'Проверьте, что токен действует не дольше, чем используются '
+            'утверждения о роли из него.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication, metrics
+
+URL = '/api/v1/users/me/'
+
+
+def get_counters():
+    return metrics.registry.collect().counters
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TokenCache:
+
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        authentication.token_cache.clear()
+        metrics.registry.reset()
+        yield
+        authentication.token_cache.clear()
+        metrics.registry.reset()
+
+    def test_01_hits_and_misses(self, user, monkeypatch):
+        decode = TokenBackend.decode
+        decoded = []
+
+        def counting_decode(backend, *args, **kwargs):
+            decoded.append(args)
+            return decode(backend, *args, **kwargs)
+
+        monkeypatch.setattr(TokenBackend, 'decode', counting_decode)
+        client = get_client(AccessToken.for_user(user))
+        for _ in range(3):
+            assert client.get(URL).status_code == HTTPStatus.OK
+        assert len(decoded) == 1, (
+            'Проверьте, что подпись уже проверенного токена не '
+            'проверяется повторно.'
+        )
+        counters = get_counters()
+        assert counters.get('yamdb_jwt_cache_misses_total') == 1
+        assert counters.get('yamdb_jwt_cache_hits_total') == 2
+
+    def test_02_expired_token(self, user, monkeypatch):
+        token = AccessToken.for_user(user)
+        client = get_client(token)
+        assert client.get(URL).status_code == HTTPStatus.OK
+
+        monkeypatch.setattr(
+            authentication, 'time', lambda: token['exp'] + 1
+        )
+        monkeypatch.setattr(
+            'rest_framework_simplejwt.tokens.aware_utcnow',
+            lambda: token.current_time.replace(
+                year=token.current_time.year + 1
+            )
+        )
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что кэш не возвращает истёкший токен.'
+        )
+        assert get_counters().get('yamdb_jwt_cache_hits_total') is None
+
+    def test_03_eviction(self, user, monkeypatch):
+        monkeypatch.setattr(authentication.token_cache, 'size', 2)
+        tokens = [AccessToken.for_user(user) for _ in range(3)]
+        for token in tokens:
+            assert get_client(token).get(URL).status_code == HTTPStatus.OK
+        assert len(authentication.token_cache.entries) == 2, (
+            'Проверьте, что размер кэша токенов ограничен.'
+        )
+        assert get_client(tokens[0]).get(URL).status_code == HTTPStatus.OK
+        counters = get_counters()
+        assert counters.get('yamdb_jwt_cache_evictions_total') == 2
+        assert counters.get('yamdb_jwt_cache_misses_total') == 4
+
+    def test_04_invalid_token(self, user):
+        header, payload, signature = str(AccessToken.for_user(user)).split(
+            '.'
+        )
+        client = get_client(f'{header}.{payload}.{signature[::-1]}')
+        for _ in range(2):
+            assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+        assert not authentication.token_cache.entries, (
+            'Проверьте, что токены с неверной подписью не кэшируются.'
+        )
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import revocation
+from api.confirmation import make_confirmation_code
+from api_yamdb.settings import REVOCATION_FILTER_REFRESH
+from reviews.models import RevokedToken
+
+URL_TOKEN = '/api/v1/auth/token/'
+URL_REFRESH = '/api/v1/auth/token/refresh/'
+URL_REVOKE = '/api/v1/auth/token/revoke/'
+URL_USERS = '/api/v1/users/'
+
+
+def get_tokens(user):
+    response = APIClient().post(URL_TOKEN, data={
+        'username': user.username,
+        'confirmation_code': make_confirmation_code(user.id, user.email),
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert 'refresh' in response.json(), (
+        f'Проверьте, что POST-запрос к `{URL_TOKEN}` возвращает '
+        'refresh-токен.'
+    )
+    return response.json()
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TokenRevocation:
+
+    def test_01_refresh(self, admin):
+        tokens = get_tokens(admin)
+        admin.role = admin.USER
+        admin.save()
+        assert get_client(tokens['token']).get(
+            URL_USERS
+        ).status_code == HTTPStatus.OK
+
+        response = APIClient().post(
+            URL_REFRESH, data={'refresh': tokens['refresh']}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{URL_REFRESH}` с refresh-токеном '
+            'возвращает новый токен.'
+        )
+        token = response.json()['token']
+        assert AccessToken(token)['role'] == admin.USER, (
+            'Проверьте, что обновлённый токен содержит текущую роль '
+            'пользователя.'
+        )
+        assert get_client(token).get(
+            URL_USERS
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_refresh_invalid(self, admin):
+        tokens = get_tokens(admin)
+        for data in (
+            {},
+            {'refresh': 'invalid'},
+            {'refresh': tokens['token']},
+        ):
+            response = APIClient().post(URL_REFRESH, data=data)
+            assert response.status_code in (
+                HTTPStatus.BAD_REQUEST, HTTPStatus.UNAUTHORIZED
+            ), (
+                f'Проверьте, что POST-запрос к `{URL_REFRESH}` без '
+                'корректного refresh-токена не возвращает новый токен.'
+            )
+
+    def test_03_revoke(self, admin):
+        tokens = get_tokens(admin)
+        other_tokens = get_tokens(admin)
+        for _ in range(2):
+            response = APIClient().post(
+                URL_REVOKE, data={'refresh': tokens['refresh']}
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT, (
+                f'Проверьте, что POST-запрос к `{URL_REVOKE}` отзывает '
+                'refresh-токен, в том числе повторно.'
+            )
+        assert get_client(tokens['token']).get(
+            URL_USERS
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после отзыва refresh-токена выданный по нему '
+            'токен не принимается.'
+        )
+        response = APIClient().post(
+            URL_REFRESH, data={'refresh': tokens['refresh']}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что отозванный refresh-токен нельзя обновить.'
+        )
+        assert get_client(other_tokens['token']).get(
+            URL_USERS
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что отзыв токена не затрагивает другие токены '
+            'пользователя.'
+        )
+
+    def test_04_no_revocation_query(self, admin):
+        client = get_client(get_tokens(admin)['token'])
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(URL_USERS).status_code == HTTPStatus.OK
+        assert not [
+            query for query in queries.captured_queries
+            if 'reviews_revokedtoken' in query['sql']
+        ], (
+            'Проверьте, что проверка отзыва токена не выполняет '
+            'SQL-запросов.'
+        )
+
+    def test_05_rebuild(self, admin, monkeypatch):
+        tokens = get_tokens(admin)
+        client = get_client(tokens['token'])
+        RevokedToken.objects.create(
+            jti=AccessToken(tokens['token'])['sid'],
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        assert client.get(URL_USERS).status_code == HTTPStatus.OK
+
+        built_at = revocation.revocation_list.built_at
+        monkeypatch.setattr(
+            revocation, 'time',
+            lambda: built_at + REVOCATION_FILTER_REFRESH + 1
+        )
+        assert client.get(URL_USERS).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что фильтр отзыва перестраивается из базы раз в '
+            'REVOCATION_FILTER_REFRESH секунд.'
+        )
+
+    def test_06_bloom_filter(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        values = [f'revoked-{index}' for index in range(1000)]
+        for value in values:
+            bloom.add(value)
+        assert all(value in bloom for value in values), (
+            'Проверьте, что фильтр Блума не теряет добавленные значения.'
+        )
+        false_positives = sum(
+            f'other-{index}' in bloom for index in range(10000)
+        )
+        assert false_positives < 300
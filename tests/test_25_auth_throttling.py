@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import throttling
+from api_yamdb.settings import REST_FRAMEWORK
+from reviews.models import EmailOutbox
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def get_limit(scope):
+    return int(REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope].split('/')[0])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25AuthThrottling:
+
+    @pytest.fixture(autouse=True)
+    def throttling_enabled(self, monkeypatch):
+        monkeypatch.setattr(throttling, 'THROTTLE_ENABLED', True)
+        throttling.reset()
+        yield
+        throttling.reset()
+
+    def test_01_username(self, client):
+        data = {'username': 'throttled', 'email': 'throttled@yamdb.fake'}
+        for _ in range(get_limit('auth_username')):
+            assert client.post(
+                URL_SIGNUP, data=data
+            ).status_code == HTTPStatus.OK
+        outbox = EmailOutbox.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(URL_SIGNUP, data={
+                'username': data['username'].upper(),
+                'email': 'other@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота POST-запросов к `{URL_SIGNUP}` с одним '
+            '`username` ограничена.'
+        )
+        assert 'Retry-After' in response
+        assert not queries.captured_queries, (
+            'Проверьте, что отклонённый запрос не обращается к базе.'
+        )
+        assert EmailOutbox.objects.count() == outbox
+
+        response = client.post(URL_TOKEN, data={
+            'username': data['username'], 'confirmation_code': '000000'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запросы к разным эндпоинтам считаются отдельно.'
+        )
+
+    def test_02_email(self, client):
+        for index in range(get_limit('auth_email') + 1):
+            response = client.post(URL_SIGNUP, data={
+                'username': f'user_{index}', 'email': 'same@yamdb.fake'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота POST-запросов к `{URL_SIGNUP}` с одним '
+            '`email` ограничена.'
+        )
+
+    def test_03_ip(self):
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        for index in range(get_limit('auth_ip') + 1):
+            response = client.post(URL_TOKEN, data={
+                'username': f'user_{index}', 'confirmation_code': '000000'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота POST-запросов к `{URL_TOKEN}` с одного '
+            'IP-адреса ограничена.'
+        )
+        response = APIClient(REMOTE_ADDR='10.0.0.2').post(URL_TOKEN, data={
+            'username': 'user_0', 'confirmation_code': '000000'
+        })
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_ip_forwarded_for(self):
+        client = APIClient(REMOTE_ADDR='10.0.0.3')
+        for index in range(get_limit('auth_ip') + 1):
+            response = client.post(
+                URL_TOKEN,
+                data={
+                    'username': f'user_{index}', 'confirmation_code': '000000'
+                },
+                HTTP_X_FORWARDED_FOR=f'192.0.2.{index}'
+            )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделанный заголовок X-Forwarded-For не '
+            'сбрасывает счётчик запросов с IP-адреса.'
+        )
+
+    def test_04_sliding_window(self):
+        state, wait = None, None
+        for _ in range(10):
+            state, wait = throttling.slide(state, 100, 60, 10)
+            assert wait is None
+        state, wait = throttling.slide(state, 110, 60, 10)
+        assert wait == pytest.approx(10), (
+            'Проверьте время ожидания при заполненном окне.'
+        )
+        for _ in range(2):
+            state, wait = throttling.slide(state, 130, 60, 10)
+            assert wait is None
+        state, wait = throttling.slide(state, 130, 60, 10)
+        assert wait == pytest.approx(2), (
+            'Проверьте, что запросы предыдущего окна учитываются в '
+            'следующем с убывающим весом.'
+        )
+        state, wait = throttling.slide(state, 130 + wait + 0.01, 60, 10)
+        assert wait is None
+        state, wait = throttling.slide(state, 300, 60, 10)
+        assert wait is None and state[1:] == (0, 1)
+
+    def test_05_sqlite_backend(self, tmp_path):
+        path = tmp_path / 'throttle.sqlite3'
+        workers = [throttling.SQLiteCounter(path, 60) for _ in range(2)]
+        results = [
+            workers[index % 2].hit('auth_ip:SignUpAPIView:1', 3, 100)
+            for index in range(4)
+        ]
+        assert results[:3] == [None] * 3 and results[3] is not None, (
+            'Проверьте, что счётчики в SQLite общие для процессов сервера.'
+        )
@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from api_yamdb.settings import SQLITE_PRAGMAS
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SqlitePragmas:
+
+    def test_01_connection_pragmas(self):
+        connection.close()
+        with connection.cursor() as cursor:
+            values = {}
+            for name in SQLITE_PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        assert values['journal_mode'] == 'wal', (
+            'Проверьте, что новое соединение с SQLite переводится в режим '
+            'WAL.'
+        )
+        assert values == {
+            'busy_timeout': SQLITE_PRAGMAS['busy_timeout'],
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'mmap_size': SQLITE_PRAGMAS['mmap_size'],
+            'cache_size': SQLITE_PRAGMAS['cache_size'],
+            'temp_store': 2,
+        }, (
+            'Проверьте, что на новом соединении с SQLite выполняются PRAGMA '
+            'из SQLITE_PRAGMAS.'
+        )
+
+    def test_02_benchmark_sqlite(self, tmp_path):
+        output = tmp_path / 'sqlite.json'
+        stdout = io.StringIO()
+        call_command(
+            'benchmark_sqlite', writers=2, readers=2, duration=0.2,
+            titles=10, rows=100, output=output, stdout=stdout
+        )
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+        assert set(report) == {'default', 'tuned'}, (
+            'Проверьте, что команда `benchmark_sqlite` замеряет базу с '
+            'настройками по умолчанию и с SQLITE_PRAGMAS.'
+        )
+        for result in report.values():
+            assert result['writes_per_second'] > 0
+            assert result['reads_per_second'] > 0
+        assert report['tuned']['pragmas'] == SQLITE_PRAGMAS
@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, transaction
+
+from api import metrics, retry
+from api_yamdb.settings import LOCK_RETRY_ATTEMPTS
+from reviews.models import Review, TitleQuerySet
+from tests.query_budgets import QUERY_BUDGETS
+from tests.utils import create_titles
+
+
+def failing(errors, result=None):
+    """Функция, которая выбрасывает ошибки errors по очереди."""
+    calls = []
+
+    def function():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return function, calls
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27LockRetry:
+
+    @pytest.fixture(autouse=True)
+    def delays(self, monkeypatch):
+        metrics.registry.reset()
+        delays = []
+        monkeypatch.setattr(retry, 'sleep', delays.append)
+        yield delays
+        metrics.registry.reset()
+
+    def test_01_retry_lock_errors(self, delays):
+        function, calls = failing(
+            [OperationalError('database is locked')] * 2, 'ok'
+        )
+        assert retry.retry_on_lock(function)() == 'ok'
+        assert len(calls) == 3, (
+            'Проверьте, что транзакция повторяется при `database is locked`.'
+        )
+        assert len(delays) == 2
+        for attempt, delay in enumerate(delays):
+            assert 0 <= delay <= min(
+                retry.LOCK_RETRY_MAX_DELAY,
+                retry.LOCK_RETRY_BASE_DELAY * 2 ** attempt
+            ), 'Проверьте, что пауза между повторами ограничена.'
+        counters = metrics.registry.collect().counters
+        assert counters.get('yamdb_db_lock_retries_total') == 2
+
+    def test_02_other_errors(self):
+        function, calls = failing([OperationalError('no such table: x')])
+        with pytest.raises(OperationalError):
+            retry.retry_on_lock(function)()
+        assert len(calls) == 1, (
+            'Проверьте, что повторяются только ошибки блокировки базы.'
+        )
+
+    def test_03_inside_transaction(self):
+        function, calls = failing([OperationalError('database is locked')])
+        with pytest.raises(OperationalError), transaction.atomic():
+            retry.retry_on_lock(function)()
+        assert len(calls) == 1, (
+            'Проверьте, что внутри транзакции запрос не повторяется: '
+            'откатить можно только транзакцию целиком.'
+        )
+
+    @pytest.fixture
+    def no_review_budget(self, monkeypatch):
+        """Каждая попытка повторяет запросы, бюджет рассчитан на одну."""
+        monkeypatch.delitem(QUERY_BUDGETS, 'ReviewViewSet.create')
+
+    @pytest.mark.usefixtures('no_review_budget')
+    def test_04_review_retry(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        update_rating = TitleQuerySet.update_rating
+        errors = [OperationalError('database is locked')]
+
+        def locked_update_rating(queryset):
+            if errors:
+                raise errors.pop()
+            return update_rating(queryset)
+
+        monkeypatch.setattr(
+            TitleQuerySet, 'update_rating', locked_update_rating
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что добавление отзыва повторяется при '
+            '`database is locked`.'
+        )
+        assert Review.objects.count() == 1, (
+            'Проверьте, что повтор не создаёт отзыв дважды.'
+        )
+
+    @pytest.mark.usefixtures('no_review_budget')
+    def test_05_review_give_up(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        calls = []
+
+        def locked_update_rating(queryset):
+            calls.append(1)
+            raise OperationalError('database is locked')
+
+        monkeypatch.setattr(
+            TitleQuerySet, 'update_rating', locked_update_rating
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что после всех повторов возвращается ответ со '
+            'статусом 503.'
+        )
+        assert len(calls) == LOCK_RETRY_ATTEMPTS
+        assert not Review.objects.exists()
+        counters = metrics.registry.collect().counters
+        assert counters.get('yamdb_db_lock_give_ups_total') == 1
+        assert counters.get('yamdb_db_lock_retries_total') == (
+            LOCK_RETRY_ATTEMPTS - 1
+        )
@@ -1,5 +1,8 @@
+import io
 from http import HTTPStatus
 
+from django.core.management import call_command
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,8 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def send_outbox_emails():
+    """Отправляет письма исходящей очереди, как фоновая команда."""
+    call_command('send_outbox_emails', once=True, stdout=io.StringIO())